@@ -1,6 +1,7 @@
 from apscheduler.jobstores.base import JobLookupError
 from collections import defaultdict
 from datetime import datetime
+from functools import partial
 from flask import request, session
 from flask_login import current_user
 from napalm._SUPPORTED_DRIVERS import SUPPORTED_DRIVERS
@@ -10,8 +11,15 @@ from pathlib import Path
 from re import search, sub
 from uuid import uuid4
 
+from eNMS.config import config
 from eNMS.controller.base import BaseController
-from eNMS.database import Session
+from eNMS.controller.connections import ConnectionMonitor, ConnectionPool
+from eNMS.controller.executor import RunQueue
+from eNMS.controller.logs import RunLogStore
+from eNMS.controller.results import ResultWriter
+from eNMS.controller.state import create_run_state_store
+from eNMS.controller.workers import ProcessPool, WorkerPool
+from eNMS.database import reset_connection_pool, Session
 from eNMS.database.functions import delete, factory, fetch, fetch_all, objectify
 
 
@@ -21,14 +29,40 @@ class AutomationController(BaseController):
     NETMIKO_SCP_DRIVERS = sorted((driver, driver) for driver in FILE_TRANSFER_MAP)
     NAPALM_DRIVERS = sorted((driver, driver) for driver in SUPPORTED_DRIVERS[1:])
     connections_cache = {"napalm": defaultdict(dict), "netmiko": defaultdict(dict)}
-    service_db = defaultdict(lambda: {"runs": 0})
     run_db = defaultdict(dict)
-    run_logs = defaultdict(list)
+    run_logs = RunLogStore(
+        Path.cwd() / "logs" / "runs", config["automation"]["run_log_buffer_size"]
+    )
+    workflow_graphs = {}
+    worker_pool = WorkerPool(
+        config["automation"]["max_workers"], cleanup=Session.remove
+    )
+    process_pool = ProcessPool(
+        config["automation"]["max_worker_processes"], initializer=reset_connection_pool
+    )
+    result_writer = ResultWriter(
+        config["automation"]["result_batch_size"],
+        config["automation"]["result_flush_interval"],
+        on_flush=partial(BaseController.table_counts.invalidate, "result"),
+    )
+    connection_pool = ConnectionPool(**config["automation"]["connection_pool"])
+    connection_monitor = ConnectionMonitor(
+        **config["automation"]["connection_liveness"]
+    )
+    run_state_store = create_run_state_store(**config["automation"]["run_state"])
+    run_queue = (
+        RunQueue(config["automation"]["executor"]["queue_path"])
+        if config["automation"]["executor"]["mode"] == "queue"
+        else None
+    )
 
     def stop_workflow(self, runtime):
         run = fetch("run", allow_none=True, runtime=runtime)
-        if run and run.run_state["status"] == "Running":
-            run.run_state["status"] = "stop"
+        if run and run.run_state.get("status") == "Running":
+            if run.parent_runtime in self.run_db:
+                run.run_state["status"] = "stop"
+            else:
+                self.run_state_store.request_stop(runtime)
             return True
 
     def add_edge(self, workflow_id, subtype, source, destination):
@@ -122,11 +156,28 @@ class AutomationController(BaseController):
         workflow = fetch("workflow", id=workflow_id)
         return workflow.duplicate().serialized
 
-    def get_service_logs(self, service, runtime):
+    def get_service_logs(self, service, runtime, offset=0):
         run = fetch("run", allow_none=True, parent_runtime=runtime, service_id=service)
-        result = run.result() if run else None
-        logs = result["logs"] if result else self.run_logs.get(runtime, [])
-        return {"logs": "\n".join(logs), "refresh": not bool(result)}
+        result, offset = run.result() if run else None, int(offset)
+        stored_logs = result.result.get("logs") if result else None
+        if stored_logs and isinstance(stored_logs, list):
+            lines = [row for line in stored_logs for row in line.split("\n")]
+            logs, offset = lines[offset:], max(len(lines), offset)
+        else:
+            logs, offset = self.run_logs.read(runtime, offset)
+        return {"logs": "\n".join(logs), "offset": offset, "refresh": not bool(result)}
+
+    def get_worker_pool_metrics(self):
+        return self.worker_pool.metrics
+
+    def get_run_queue_metrics(self):
+        return self.run_queue.metrics if self.run_queue else {}
+
+    def get_connection_pool_metrics(self):
+        return {
+            **self.connection_pool.metrics,
+            "connections": self.connection_monitor.metrics,
+        }
 
     def get_runtimes(self, type, id):
         runs = fetch("run", allow_none=True, all_matches=True, service_id=id)
@@ -259,6 +310,16 @@ class AutomationController(BaseController):
 
     @staticmethod
     def run(service, **kwargs):
+        run, payload = AutomationController.create_run(service, **kwargs)
+        return run.run(payload)
+
+    @staticmethod
+    def start_run(service, **kwargs):
+        run, payload = AutomationController.create_run(service, **kwargs)
+        return run.start(payload)
+
+    @staticmethod
+    def create_run(service, **kwargs):
         run_kwargs = {
             key: kwargs.pop(key)
             for key in ("creator", "runtime", "task", "devices", "pools")
@@ -275,8 +336,14 @@ class AutomationController(BaseController):
         initial_payload = fetch("service", id=service).initial_payload
         run = factory("run", service=service, **run_kwargs)
         run.properties = kwargs
-        payload = {**initial_payload, **kwargs}
-        return run.run(payload)
+        return run, {**initial_payload, **kwargs}
+
+    def dispatch_run(self, service, **kwargs):
+        if not self.run_queue:
+            return self.start_run(service, **kwargs)
+        kwargs["runtime"] = runtime = kwargs.get("runtime") or self.get_time()
+        self.run_queue.enqueue(service, kwargs)
+        return {"runtime": runtime, "queued": True}
 
     def run_service(self, id=None, **kwargs):
         for property in ("user", "csrf_token", "form_type"):
@@ -284,10 +351,12 @@ class AutomationController(BaseController):
         kwargs["creator"] = getattr(current_user, "name", "admin")
         service = fetch("service", id=id)
         kwargs["runtime"] = runtime = self.get_time()
-        if kwargs.get("asynchronous", True):
+        if kwargs.get("asynchronous", True) and self.run_queue:
+            self.run_queue.enqueue(id, kwargs)
+        elif kwargs.get("asynchronous", True):
             self.scheduler.add_job(
                 id=self.get_time(),
-                func=self.run,
+                func=self.start_run,
                 run_date=datetime.now(),
                 args=[id],
                 kwargs=kwargs,
@@ -332,7 +401,13 @@ class AutomationController(BaseController):
         if runs and runtime != "normal":
             if runtime == "latest":
                 runtime = runs[-1].parent_runtime
-            state = self.run_db.get(runtime) or fetch("run", runtime=runtime).state
+            state = (
+                self.run_db.get(runtime)
+                or self.run_state_store.get(runtime)
+                or getattr(
+                    fetch("run", allow_none=True, runtime=runtime), "state", None
+                )
+            )
         return {
             "service": service.to_dict(include=["services", "edges"]),
             "runtimes": [(r.parent_runtime, r.creator) for r in runs],
@@ -364,6 +439,8 @@ class AutomationController(BaseController):
         return results
 
     def scheduler_action(self, action):
+        if not self.main_process:
+            return {"alert": "The scheduler runs in another process."}
         getattr(self.scheduler, action)()
 
     def task_action(self, action, task_id):
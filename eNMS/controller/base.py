@@ -1,3 +1,4 @@
+from apscheduler.events import EVENT_JOB_ADDED, EVENT_JOB_MODIFIED, EVENT_JOB_REMOVED
 from apscheduler.schedulers.background import BackgroundScheduler
 from collections import Counter
 from datetime import datetime
@@ -6,16 +7,17 @@ from email.mime.application import MIMEApplication
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.utils import formatdate
+from fcntl import flock, LOCK_EX, LOCK_NB
 from flask_login import current_user
 from git import Repo
 from hvac import Client as VaultClient
 from importlib import import_module
 from importlib.util import module_from_spec, spec_from_file_location
-from json import load
+from json import dumps, load
 from ldap3 import ALL, Server
 from logging import basicConfig, error, info, StreamHandler, warning
 from logging.handlers import RotatingFileHandler
-from os import environ, scandir
+from os import environ, register_at_fork, scandir
 from os.path import exists
 from pathlib import Path
 from requests import Session as RequestSession
@@ -23,16 +25,18 @@ from requests.adapters import HTTPAdapter
 from requests.packages.urllib3.util.retry import Retry
 from ruamel import yaml
 from smtplib import SMTP
+from socket import AF_UNIX, SOCK_DGRAM, socket
 from string import punctuation
 from sqlalchemy import and_, func, or_
 from sqlalchemy.exc import IntegrityError, InvalidRequestError
-from sqlalchemy.orm import configure_mappers
+from sqlalchemy.orm import ColumnProperty, configure_mappers
 from sys import path as sys_path
 from tacacs_plus.client import TACACSClient
+from threading import Thread
 from uuid import getnode
 
 from eNMS.config import config
-from eNMS.database import Base, DIALECT, engine, Session
+from eNMS.database import Base, create_indexes, DIALECT, engine, Session
 from eNMS.database.events import configure_events
 from eNMS.database.functions import (
     count,
@@ -56,11 +60,18 @@ from eNMS.properties.objects import (
     pool_device_properties,
 )
 from eNMS.controller.syslog import SyslogServer
+from eNMS.controller.tables import (
+    seek_constraint,
+    table_cursor,
+    table_loader_options,
+    TableCountCache,
+)
 
 
 class BaseController:
 
     log_severity = {"error": error, "info": info, "warning": warning}
+    table_counts = TableCountCache(config["database"]["count_cache_ttl"])
 
     get_endpoints = [
         "/administration",
@@ -111,6 +122,7 @@ class BaseController:
         "get",
         "get_all",
         "get_cluster_status",
+        "get_connection_pool_metrics",
         "get_device_network_data",
         "get_device_logs",
         "get_exported_services",
@@ -118,9 +130,11 @@ class BaseController:
         "get_service_logs",
         "get_properties",
         "get_result",
+        "get_run_queue_metrics",
         "get_runtimes",
         "get_view_topology",
         "get_service_state",
+        "get_worker_pool_metrics",
         "get_top_level_workflows",
         "get_workflow_results",
         "get_workflow_services",
@@ -151,6 +165,7 @@ class BaseController:
 
     rest_endpoints = [
         "get_cluster_status",
+        "get_connection_pool_metrics",
         "get_git_content",
         "update_all_pools",
         "update_database_configurations_from_git",
@@ -160,6 +175,7 @@ class BaseController:
         self.config = config
         self.path = Path.cwd()
         self.custom_properties = self.load_custom_properties()
+        self.main_process = self.acquire_main_process_lock()
         self.init_scheduler()
         if config["tacacs"]["active"]:
             self.init_tacacs_client()
@@ -167,7 +183,7 @@ class BaseController:
             self.init_ldap_client()
         if config["vault"]["active"]:
             self.init_vault_client()
-        if config["syslog"]["active"]:
+        if config["syslog"]["active"] and self.main_process:
             self.init_syslog_server()
         if config["paths"]["custom_code"]:
             sys_path.append(config["paths"]["custom_code"])
@@ -178,7 +194,12 @@ class BaseController:
     def configure_database(self):
         self.init_services()
         Base.metadata.create_all(bind=engine)
+        create_indexes()
         configure_mappers()
+        self.table_loaders = {
+            table: table_loader_options(models[table], properties)
+            for table, properties in table_properties.items()
+        }
         configure_events(self)
         self.init_forms()
         self.clean_database()
@@ -309,7 +330,47 @@ class BaseController:
             }
         )
 
-        self.scheduler.start()
+        if self.main_process:
+            self.scheduler_socket = socket(AF_UNIX, SOCK_DGRAM)
+            if self.scheduler_socket_path.exists():
+                self.scheduler_socket_path.unlink()
+            self.scheduler_socket.bind(str(self.scheduler_socket_path))
+            register_at_fork(after_in_child=self.scheduler_socket.close)
+        else:
+            self.scheduler.add_listener(
+                self.notify_scheduler,
+                EVENT_JOB_ADDED | EVENT_JOB_MODIFIED | EVENT_JOB_REMOVED,
+            )
+        self.scheduler.start(paused=not self.main_process)
+        if self.main_process:
+            Thread(target=self.wake_scheduler, daemon=True).start()
+
+    @property
+    def scheduler_socket_path(self):
+        return self.path / "scheduler.sock"
+
+    def acquire_main_process_lock(self):
+        self.main_process_lock = open(self.path / "main_process.lock", "w")
+        try:
+            flock(self.main_process_lock, LOCK_EX | LOCK_NB)
+        except OSError:
+            self.main_process_lock.close()
+            return False
+        register_at_fork(after_in_child=self.main_process_lock.close)
+        return True
+
+    def wake_scheduler(self):
+        while True:
+            self.scheduler_socket.recv(1)
+            self.scheduler.wakeup()
+
+    def notify_scheduler(self, event):
+        with socket(AF_UNIX, SOCK_DGRAM) as notification:
+            notification.setblocking(False)
+            try:
+                notification.sendto(b"\0", str(self.scheduler_socket_path))
+            except OSError:
+                pass
 
     def init_forms(self):
         for file in (self.path / "eNMS" / "forms").glob("**/*.py"):
@@ -479,11 +540,12 @@ class BaseController:
         model, properties = models[table], table_properties[table]
         operator = and_ if kwargs["form"].get("operator", "all") == "all" else or_
         column_index = int(kwargs["order"][0]["column"])
+        direction = kwargs["order"][0]["dir"]
         if column_index < len(properties):
             order_property = getattr(model, properties[column_index])
-            order_function = getattr(order_property, kwargs["order"][0]["dir"], None)
+            order_function = getattr(order_property, direction, None)
         else:
-            order_function = None
+            order_property = order_function = None
         constraints = self.build_filtering_constraints(table, **kwargs)
         if table == "result":
             constraints.append(
@@ -505,18 +567,41 @@ class BaseController:
         if table == "run":
             constraints.append(models["run"].children.any())
         result = Session.query(model).filter(operator(*constraints))
+        instance_id = (kwargs.get("instance") or {}).get("id")
+        filtering_key = dumps(
+            [kwargs["form"], instance_id, kwargs.get("runtime")], sort_keys=True
+        )
+        records_filtered = self.table_counts.get(
+            table, filtering_key, lambda: get_query_count(result)
+        )
+        seekable = order_function and isinstance(
+            getattr(order_property, "property", None), ColumnProperty
+        )
         if order_function:
-            result = result.order_by(order_function())
+            result = result.order_by(order_function(), getattr(model.id, direction)())
+        if seekable and kwargs.get("cursor"):
+            nulls_first = (direction == "asc") != DIALECT.startswith("postgres")
+            result = result.filter(
+                seek_constraint(
+                    model, order_property, direction, kwargs["cursor"], nulls_first
+                )
+            )
+        else:
+            result = result.offset(int(kwargs["start"]))
+        result = result.options(*self.table_loaders[table])
+        objects = result.limit(int(kwargs["length"])).all()
+        if issubclass(model, models["service"]):
+            kwargs["running_services"] = self.run_state_store.running_services()
         return {
             "draw": int(kwargs["draw"]),
-            "recordsTotal": Session.query(func.count(model.id)).scalar(),
-            "recordsFiltered": get_query_count(result),
-            "data": [
-                obj.generate_row(**kwargs)
-                for obj in result.limit(int(kwargs["length"]))
-                .offset(int(kwargs["start"]))
-                .all()
-            ],
+            "recordsTotal": self.table_counts.get(
+                table, None, lambda: Session.query(func.count(model.id)).scalar()
+            ),
+            "recordsFiltered": records_filtered,
+            "data": [obj.generate_row(**kwargs) for obj in objects],
+            "cursor": table_cursor(objects[-1], properties[column_index])
+            if seekable and objects
+            else None,
         }
 
     def allowed_file(self, name, allowed_modules):
@@ -0,0 +1,189 @@
+from collections import OrderedDict
+from os import register_at_fork
+from threading import Lock, Thread
+from time import sleep, time
+from weakref import WeakKeyDictionary
+
+
+class ConnectionPool:
+    def __init__(
+        self,
+        active,
+        max_idle_time,
+        max_lifetime,
+        max_connections,
+        max_connections_per_device,
+        reap_interval,
+    ):
+        self.active = active
+        self.max_idle_time = max_idle_time
+        self.max_lifetime = max_lifetime
+        self.max_connections = max_connections
+        self.max_connections_per_device = max_connections_per_device
+        self.reap_interval = reap_interval
+        self.reset()
+        register_at_fork(after_in_child=self.reset)
+
+    def reset(self):
+        self.lock = Lock()
+        self.idle, self.borrowed, self.reaper = OrderedDict(), {}, None
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    @property
+    def metrics(self):
+        with self.lock:
+            return {
+                "idle": len(self.idle),
+                "borrowed": len(self.borrowed),
+                **self.counters,
+            }
+
+    def register(self, key, connection):
+        if self.active:
+            with self.lock:
+                self.borrowed[id(connection)] = (key, connection, time())
+
+    def acquire(self, key):
+        if not self.active:
+            return
+        with self.lock:
+            for connection_id, (idle_key, *_) in reversed(self.idle.items()):
+                if idle_key == key:
+                    _, connection, created, _ = self.idle.pop(connection_id)
+                    self.borrowed[connection_id] = (key, connection, created)
+                    self.counters["hits"] += 1
+                    return connection
+            self.counters["misses"] += 1
+
+    def forget(self, connection):
+        with self.lock:
+            self.borrowed.pop(id(connection), None)
+
+    def release(self, connection):
+        with self.lock:
+            if id(connection) not in self.borrowed:
+                return False
+            key, connection, created = self.borrowed.pop(id(connection))
+            if time() - created >= self.max_lifetime:
+                self.counters["expirations"] += 1
+                evicted = [(key, connection)]
+            else:
+                self.idle[id(connection)] = (key, connection, created, time())
+                evicted = self.evict(key)
+            if not self.reaper:
+                self.reaper = Thread(target=self.reap, daemon=True)
+                self.reaper.start()
+        self.close_all(evicted)
+        return True
+
+    def evict(self, key):
+        evicted, device_connections = [], [
+            connection_id
+            for connection_id, (idle_key, *_) in self.idle.items()
+            if idle_key[1] == key[1]
+        ]
+        excess = len(device_connections) - self.max_connections_per_device
+        for connection_id in device_connections[: max(excess, 0)]:
+            evicted.append(self.idle.pop(connection_id)[:2])
+        while len(self.idle) > self.max_connections:
+            evicted.append(self.idle.popitem(last=False)[1][:2])
+        self.counters["evictions"] += len(evicted)
+        return evicted
+
+    def reap(self):
+        while True:
+            sleep(self.reap_interval)
+            now, expired = time(), []
+            with self.lock:
+                for connection_id, (key, connection, created, released) in list(
+                    self.idle.items()
+                ):
+                    if (
+                        now - released >= self.max_idle_time
+                        or now - created >= self.max_lifetime
+                    ):
+                        expired.append(self.idle.pop(connection_id)[:2])
+                self.counters["expirations"] += len(expired)
+            self.close_all(expired)
+
+    def close_all(self, connections):
+        for (library, *_), connection in connections:
+            self.close(library, connection)
+
+    @staticmethod
+    def close(library, connection):
+        try:
+            connection.disconnect() if library == "netmiko" else connection.close()
+        except Exception:
+            pass
+
+
+class ConnectionMonitor:
+    def __init__(self, trust_window, probe_interval, clock=time):
+        self.trust_window = trust_window
+        self.probe_interval = probe_interval
+        self.clock = clock
+        self.reset()
+        register_at_fork(after_in_child=self.reset)
+
+    def reset(self):
+        self.lock, self.connections = Lock(), WeakKeyDictionary()
+
+    @property
+    def metrics(self):
+        with self.lock:
+            return [dict(state) for state in self.connections.values()]
+
+    def track(self, library, name, connection):
+        with self.lock:
+            self.connections[connection] = {
+                "library": library,
+                "name": name,
+                "last_used": self.clock(),
+                "last_probe": self.clock(),
+                "checks": 0,
+                "transport_failures": 0,
+                "probes": 0,
+                "probe_failures": 0,
+            }
+
+    def is_alive(self, library, connection):
+        now, state = self.clock(), self.connections.get(connection)
+        if state is None:
+            return self.probe(library, connection)
+        state["checks"] += 1
+        if now - state["last_used"] < self.trust_window:
+            alive = True
+        elif not self.transport_is_active(library, connection):
+            state["transport_failures"] += 1
+            alive = False
+        elif now - state["last_probe"] < self.probe_interval:
+            alive = True
+        else:
+            state["probes"] += 1
+            state["last_probe"] = now
+            alive = self.probe(library, connection)
+            state["probe_failures"] += not alive
+        if alive:
+            state["last_used"] = now
+        return alive
+
+    @staticmethod
+    def transport_is_active(library, connection):
+        if library == "napalm":
+            connection = getattr(connection, "device", None)
+        channel = getattr(connection, "remote_conn", None)
+        transport = getattr(channel, "transport", None)
+        if transport is None:
+            return True
+        return not channel.closed and transport.is_active()
+
+    @staticmethod
+    def probe(library, connection):
+        if library == "napalm":
+            return connection.is_alive()["is_alive"]
+        try:
+            connection.find_prompt()
+            return True
+        except Exception:
+            return False
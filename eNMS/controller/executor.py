@@ -0,0 +1,154 @@
+from json import dumps, loads
+from logging import error
+from os import register_at_fork
+from sqlite3 import connect
+from threading import BoundedSemaphore, local, Thread
+from time import sleep, time
+from traceback import format_exc
+
+
+class RunQueue:
+    def __init__(self, path):
+        self.path = path
+        self.reset()
+        register_at_fork(after_in_child=self.reset)
+        with self.connection as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS run_queue (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    service_id INTEGER,
+                    kwargs TEXT,
+                    status TEXT DEFAULT 'queued',
+                    executor TEXT,
+                    enqueued REAL,
+                    started REAL,
+                    heartbeat REAL,
+                    ended REAL
+                )
+                """
+            )
+
+    def reset(self):
+        self.connections = local()
+
+    @property
+    def connection(self):
+        if not hasattr(self.connections, "connection"):
+            self.connections.connection = connect(
+                self.path, timeout=30, isolation_level=None
+            )
+        return self.connections.connection
+
+    @property
+    def metrics(self):
+        rows = self.connection.execute(
+            "SELECT status, COUNT(*) FROM run_queue GROUP BY status"
+        )
+        return dict(rows.fetchall())
+
+    def enqueue(self, service_id, kwargs):
+        cursor = self.connection.execute(
+            "INSERT INTO run_queue (service_id, kwargs, enqueued) VALUES (?, ?, ?)",
+            (service_id, dumps(kwargs, default=str), time()),
+        )
+        return cursor.lastrowid
+
+    def claim(self, executor):
+        connection = self.connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            job = connection.execute(
+                "SELECT id, service_id, kwargs, started FROM run_queue "
+                "WHERE status = 'queued' ORDER BY id LIMIT 1"
+            ).fetchone()
+            if job:
+                connection.execute(
+                    "UPDATE run_queue SET status = 'running', executor = ?, "
+                    "started = ?, heartbeat = started WHERE id = ?",
+                    (executor, time(), job[0]),
+                )
+        finally:
+            connection.execute("COMMIT")
+        if not job:
+            return None
+        kwargs = loads(job[2])
+        if job[3]:
+            kwargs.pop("runtime", None)
+        return job[0], job[1], kwargs
+
+    def holds_lease(self, id, executor):
+        return self.connection.execute(
+            "UPDATE run_queue SET heartbeat = ? "
+            "WHERE id = ? AND status = 'running' AND executor = ?",
+            (time(), id, executor),
+        ).rowcount
+
+    def complete(self, id, executor, status):
+        self.connection.execute(
+            "UPDATE run_queue SET status = ?, ended = ? "
+            "WHERE id = ? AND status = 'running' AND executor = ?",
+            (status, time(), id, executor),
+        )
+
+    def heartbeat(self, executor):
+        self.connection.execute(
+            "UPDATE run_queue SET heartbeat = ? "
+            "WHERE status = 'running' AND executor = ?",
+            (time(), executor),
+        )
+
+    def requeue(self, executor=None, lease_time=None):
+        if executor:
+            condition, parameter = "executor = ?", executor
+        else:
+            condition, parameter = "heartbeat < ?", time() - lease_time
+        return self.connection.execute(
+            "UPDATE run_queue SET status = 'queued', executor = NULL "
+            f"WHERE status = 'running' AND {condition}",
+            (parameter,),
+        ).rowcount
+
+
+class RunExecutor:
+    def __init__(
+        self, queue, run, name, max_runs, poll_interval, lease_time, cleanup=None
+    ):
+        self.queue = queue
+        self.run = run
+        self.name = name
+        self.slots = BoundedSemaphore(max_runs)
+        self.poll_interval = poll_interval
+        self.lease_time = lease_time
+        self.cleanup = cleanup
+
+    def serve(self):
+        self.queue.requeue(self.name)
+        while True:
+            self.queue.heartbeat(self.name)
+            self.queue.requeue(lease_time=self.lease_time)
+            if not self.slots.acquire(timeout=self.poll_interval):
+                continue
+            job = self.queue.claim(self.name)
+            if not job:
+                self.slots.release()
+                sleep(self.poll_interval)
+                continue
+            Thread(target=self.execute, args=job, daemon=True).start()
+
+    def execute(self, id, service_id, kwargs):
+        if not self.queue.holds_lease(id, self.name):
+            self.slots.release()
+            return
+        status = "completed"
+        try:
+            self.run(service_id, **kwargs)
+        except Exception:
+            status = "failed"
+            error(f"Queued run {id} failed:\n{format_exc()}")
+        finally:
+            if self.cleanup:
+                self.cleanup()
+            self.queue.complete(id, self.name, status)
+            self.slots.release()
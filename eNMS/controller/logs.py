@@ -0,0 +1,91 @@
+from collections import defaultdict, deque
+from itertools import islice
+from os import register_at_fork, remove
+from re import sub
+from threading import Lock
+
+
+class RunLogStore:
+    def __init__(self, folder, buffer_size):
+        self.folder = folder
+        self.buffer_size = buffer_size
+        self.reset()
+        register_at_fork(after_in_child=self.detach)
+
+    def reset(self):
+        self.lock, self.detached = Lock(), False
+        self.files, self.buffers, self.counts = {}, {}, defaultdict(int)
+        self.positions = {}
+
+    def detach(self):
+        self.reset()
+        self.detached, self.pending = True, defaultdict(list)
+
+    def path(self, runtime):
+        return self.folder / f"{sub(r'[^0-9A-Za-z]', '_', runtime)}.log"
+
+    def append(self, runtime, line):
+        self.extend(runtime, [line])
+
+    def extend(self, runtime, lines):
+        lines = [row for line in lines for row in line.split("\n")]
+        if self.detached:
+            self.pending[runtime].extend(lines)
+            return
+        with self.lock:
+            if runtime not in self.files:
+                self.folder.mkdir(parents=True, exist_ok=True)
+                self.files[runtime] = open(self.path(runtime), "a")
+                self.buffers[runtime] = deque(maxlen=self.buffer_size)
+            self.files[runtime].write("".join(f"{line}\n" for line in lines))
+            self.files[runtime].flush()
+            self.buffers[runtime].extend(lines)
+            self.counts[runtime] += len(lines)
+
+    def pop_pending(self, runtime):
+        return self.pending.pop(runtime, []) if self.detached else []
+
+    def read(self, runtime, offset=0):
+        with self.lock:
+            count, buffer = self.counts.get(runtime), self.buffers.get(runtime)
+            if buffer is not None and offset >= count - len(buffer):
+                start = offset - (count - len(buffer))
+                return list(islice(buffer, start, None)), count
+            positions = self.positions.get(runtime, {})
+            start = max((line for line in positions if line <= offset), default=0)
+            position = positions.get(start, 0)
+        path = self.path(runtime)
+        if not path.exists():
+            return [], offset
+        with open(path, "rb") as file:
+            file.seek(position)
+            *rows, _ = file.read().split(b"\n")
+        if count is not None:
+            rows = rows[: count - start]
+        position += sum(len(row) + 1 for row in rows)
+        end = start + len(rows)
+        with self.lock:
+            positions = self.positions.setdefault(runtime, {})
+            positions[end] = position
+            if len(positions) > 32:
+                del positions[min(positions)]
+        skipped = offset - start
+        return [row.decode() for row in rows[skipped:]], max(end, offset)
+
+    def close(self, runtime):
+        with self.lock:
+            file = self.files.pop(runtime, None)
+            if file:
+                file.close()
+            self.buffers.pop(runtime, None)
+            self.counts.pop(runtime, None)
+        return str(self.path(runtime))
+
+    def remove(self, runtime):
+        path = self.close(runtime)
+        with self.lock:
+            self.positions.pop(runtime, None)
+        try:
+            remove(path)
+        except FileNotFoundError:
+            pass
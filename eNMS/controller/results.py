@@ -0,0 +1,76 @@
+from json import dumps
+from logging import error
+from os import register_at_fork
+from sqlalchemy import inspect
+from threading import Lock
+from time import time
+from traceback import format_exc
+
+from eNMS.database import Session
+from eNMS.models import models
+
+
+class ResultWriter:
+    def __init__(self, batch_size, flush_interval, on_flush=None):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_flush = on_flush
+        self.reset()
+        register_at_fork(after_in_child=self.reset)
+
+    def reset(self):
+        self.lock, self.flush_lock = Lock(), Lock()
+        self.results, self.devices = [], {}
+        self.last_flush = time()
+
+    def add(self, device, result):
+        properties = self.get_device_updates(device) if device else None
+        with self.lock:
+            self.results.append(result)
+            if properties:
+                self.devices.setdefault(device.id, {"id": device.id}).update(properties)
+            flush = (
+                len(self.results) >= self.batch_size
+                or time() - self.last_flush >= self.flush_interval
+            )
+        if flush:
+            self.flush()
+
+    def get_device_updates(self, device):
+        state = inspect(device)
+        return {
+            property.key: state.attrs[property.key].value
+            for property in state.mapper.column_attrs
+            if state.attrs[property.key].history.has_changes()
+        }
+
+    def flush(self):
+        with self.flush_lock:
+            with self.lock:
+                results, devices = self.results, list(self.devices.values())
+                self.results, self.devices, self.last_flush = [], {}, time()
+            try:
+                self.write(results, devices)
+            except Exception:
+                Session.rollback()
+                for result in results:
+                    self.write_row("result", [result], [])
+                for device in devices:
+                    self.write_row("device", [], [device])
+            if results and self.on_flush:
+                self.on_flush()
+
+    def write(self, results, devices):
+        if results:
+            Session.bulk_insert_mappings(models["result"], results)
+        if devices:
+            Session.bulk_update_mappings(models["device"], devices)
+        Session.commit()
+
+    def write_row(self, model, results, devices):
+        try:
+            self.write(results, devices)
+        except Exception:
+            Session.rollback()
+            row = dumps((results or devices)[0], default=str)
+            error(f"Could not write {model} {row}:\n{format_exc()}")
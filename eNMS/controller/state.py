@@ -0,0 +1,171 @@
+from collections import Counter
+from json import dumps, loads
+from os import getpid, register_at_fork
+from sqlite3 import connect
+from threading import local, Lock, Thread
+from time import sleep, time
+
+
+class MemoryRunStateStore:
+    def __init__(self):
+        self.reset()
+        register_at_fork(after_in_child=self.detach)
+
+    def reset(self):
+        self.lock, self.publisher, self.detached = Lock(), None, False
+        self.watched, self.service_run_counts = {}, Counter()
+
+    def detach(self):
+        self.reset()
+        self.detached = True
+
+    def watch(self, runtime, state):
+        with self.lock:
+            self.watched[runtime] = state
+        if not self.detached:
+            self.publish(runtime, state)
+
+    def unwatch(self, runtime):
+        with self.lock:
+            self.watched.pop(runtime, None)
+        if not self.detached:
+            self.discard(runtime)
+
+    def publish(self, runtime, state):
+        pass
+
+    def discard(self, runtime):
+        pass
+
+    def get(self, runtime):
+        return self.watched.get(runtime)
+
+    def request_stop(self, runtime):
+        state = self.watched.get(runtime)
+        if state and state["status"] == "Running":
+            state["status"] = "stop"
+
+    def add_service_run(self, service_id, delta):
+        with self.lock:
+            self.service_run_counts[service_id] += delta
+
+    def running_services(self):
+        with self.lock:
+            return {id: runs for id, runs in self.service_run_counts.items() if runs}
+
+
+class SQLiteRunStateStore(MemoryRunStateStore):
+    def __init__(self, path, publish_interval):
+        self.path, self.publish_interval = path, publish_interval
+        self.heartbeat_timeout = 10 * publish_interval
+        super().__init__()
+        with self.connection as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS run_state
+                    (runtime TEXT PRIMARY KEY, state TEXT, stop INTEGER DEFAULT 0);
+                CREATE TABLE IF NOT EXISTS service_runs (
+                    process INTEGER, service_id INTEGER, runs INTEGER, heartbeat REAL,
+                    PRIMARY KEY (process, service_id)
+                );
+                """
+            )
+
+    def reset(self):
+        super().reset()
+        self.connections, self.process = local(), getpid()
+
+    @property
+    def connection(self):
+        if not hasattr(self.connections, "connection"):
+            self.connections.connection = connect(self.path, timeout=30)
+        return self.connections.connection
+
+    def watch(self, runtime, state):
+        super().watch(runtime, state)
+        with self.lock:
+            if not self.publisher and not self.detached:
+                self.publisher = Thread(target=self.synchronize, daemon=True)
+                self.publisher.start()
+
+    def synchronize(self):
+        while True:
+            sleep(self.publish_interval)
+            with self.lock:
+                watched = list(self.watched.items())
+            for runtime, state in watched:
+                if state["status"] == "Running" and self.stop_requested(runtime):
+                    state["status"] = "stop"
+                try:
+                    self.publish(runtime, state)
+                except RuntimeError:
+                    continue
+            with self.connection as connection:
+                connection.execute(
+                    "UPDATE service_runs SET heartbeat = ? WHERE process = ?",
+                    (time(), self.process),
+                )
+
+    def publish(self, runtime, state):
+        with self.connection as connection:
+            connection.execute(
+                "INSERT INTO run_state (runtime, state) VALUES (?, ?) "
+                "ON CONFLICT(runtime) DO UPDATE SET state = excluded.state",
+                (runtime, dumps(state, default=str)),
+            )
+
+    def discard(self, runtime):
+        with self.connection as connection:
+            connection.execute("DELETE FROM run_state WHERE runtime = ?", (runtime,))
+
+    def get(self, runtime):
+        if runtime in self.watched:
+            return self.watched[runtime]
+        row = self.connection.execute(
+            "SELECT state FROM run_state WHERE runtime = ?", (runtime,)
+        ).fetchone()
+        return loads(row[0]) if row else None
+
+    def request_stop(self, runtime):
+        if runtime in self.watched:
+            return super().request_stop(runtime)
+        with self.connection as connection:
+            connection.execute(
+                "UPDATE run_state SET stop = 1 WHERE runtime = ?", (runtime,)
+            )
+
+    def stop_requested(self, runtime):
+        row = self.connection.execute(
+            "SELECT stop FROM run_state WHERE runtime = ?", (runtime,)
+        ).fetchone()
+        return bool(row and row[0])
+
+    def add_service_run(self, service_id, delta):
+        now = time()
+        with self.connection as connection:
+            connection.execute(
+                "DELETE FROM service_runs WHERE runs <= 0 OR heartbeat < ?",
+                (now - self.heartbeat_timeout,),
+            )
+            connection.execute(
+                "INSERT INTO service_runs VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(process, service_id) DO UPDATE SET "
+                "runs = runs + excluded.runs, heartbeat = excluded.heartbeat",
+                (self.process, service_id, delta, now),
+            )
+
+    def running_services(self):
+        return dict(
+            self.connection.execute(
+                "SELECT service_id, SUM(runs) FROM service_runs WHERE heartbeat >= ? "
+                "GROUP BY service_id HAVING SUM(runs) > 0",
+                (time() - self.heartbeat_timeout,),
+            )
+        )
+
+
+def create_run_state_store(backend, sqlite_path, publish_interval):
+    if backend == "sqlite":
+        return SQLiteRunStateStore(sqlite_path, publish_interval)
+    return MemoryRunStateStore()
@@ -0,0 +1,64 @@
+from collections import Counter, defaultdict
+from os import register_at_fork
+from sqlalchemy import and_, or_
+from sqlalchemy.ext.associationproxy import AssociationProxyInstance
+from sqlalchemy.orm import joinedload, selectinload
+from threading import Lock
+from time import time
+
+
+class TableCountCache:
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self.reset()
+        register_at_fork(after_in_child=self.reset)
+
+    def reset(self):
+        self.lock, self.counts, self.generations = Lock(), defaultdict(dict), Counter()
+
+    def get(self, table, key, count):
+        now = time()
+        with self.lock:
+            generation, cached = self.generations[table], self.counts[table].get(key)
+        if cached and now - cached[1] < self.ttl:
+            return cached[0]
+        value = count()
+        with self.lock:
+            if self.generations[table] == generation:
+                self.counts[table][key] = (value, now)
+        return value
+
+    def invalidate(self, table, total=True):
+        with self.lock:
+            self.generations[table] += 1
+            counts = self.counts.pop(table, {})
+            if not total and None in counts:
+                self.counts[table][None] = counts[None]
+
+
+def seek_constraint(model, column, direction, cursor, nulls_first):
+    value, id = cursor
+    after = (lambda x, y: x < y) if direction == "desc" else (lambda x, y: x > y)
+    if value is None:
+        constraint = and_(column.is_(None), after(model.id, id))
+        return constraint if not nulls_first else or_(constraint, column.isnot(None))
+    constraint = or_(after(column, value), and_(column == value, after(model.id, id)))
+    return constraint if nulls_first else or_(constraint, column.is_(None))
+
+
+def table_cursor(obj, property):
+    value = getattr(obj, property)
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return [value, obj.id]
+
+
+def table_loader_options(model, properties):
+    relations = {}
+    for property in properties:
+        proxy = getattr(model, property, None)
+        if isinstance(proxy, AssociationProxyInstance):
+            relations[proxy.target_collection] = proxy.local_attr
+    return [
+        (selectinload if relation.property.uselist else joinedload)(relation)
+        for relation in relations.values()
+    ]
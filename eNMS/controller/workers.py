@@ -0,0 +1,267 @@
+from collections import deque
+from heapq import heappop, heappush
+from inspect import isgenerator
+from itertools import count
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from logging import error
+from multiprocessing import get_context
+from threading import Condition, Lock, Thread
+from time import time
+from traceback import format_exc
+
+
+class WorkerPool:
+    def __init__(self, max_workers, cleanup=None, clock=time):
+        self.max_workers = max_workers
+        self.cleanup = cleanup
+        self.clock = clock
+        self.condition = Condition()
+        self.batches = deque()
+        self.delayed_jobs = []
+        self.counter = count()
+        self.workers = []
+        self.idle_workers = 0
+        self.completed_jobs = 0
+
+    @property
+    def metrics(self):
+        with self.condition:
+            return {
+                "workers": len(self.workers),
+                "idle_workers": self.idle_workers,
+                "max_workers": self.max_workers,
+                "queued_jobs": sum(len(batch.jobs) for batch in self.batches),
+                "running_jobs": sum(batch.running for batch in self.batches),
+                "delayed_jobs": len(self.delayed_jobs),
+                "completed_jobs": self.completed_jobs,
+                "batches": {batch.name: batch.metrics for batch in self.batches},
+            }
+
+    def map(self, name, function, iterable, processes):
+        batch = Batch(self, name, function, iterable, processes)
+        with self.condition:
+            self.batches.append(batch)
+            self.spawn_workers()
+            self.condition.notify_all()
+        try:
+            batch.join()
+        finally:
+            self.close_batch(batch)
+        if batch.exception:
+            raise batch.exception
+        return batch.results
+
+    def open_batch(self, name, function, processes):
+        batch = Batch(self, name, function, (), processes)
+        with self.condition:
+            self.batches.append(batch)
+        return batch
+
+    def close_batch(self, batch):
+        with self.condition:
+            self.batches.remove(batch)
+
+    def park(self, name, job, delay):
+        batch = Batch(self, name, None, (), 1)
+        batch.results.append(None)
+        batch.detached = True
+        with self.condition:
+            self.batches.append(batch)
+            self.delay(batch, (0, name, job), delay)
+            self.spawn_workers()
+            self.condition.notify_all()
+
+    def spawn_workers(self):
+        pending_jobs = sum(batch.available_slots for batch in self.batches)
+        timers = 1 if self.delayed_jobs else 0
+        missing_workers = max(pending_jobs, timers) - self.idle_workers
+        while missing_workers > 0 and len(self.workers) < self.max_workers:
+            worker = Thread(target=self.work, daemon=True)
+            self.workers.append(worker)
+            worker.start()
+            missing_workers -= 1
+
+    def delay(self, batch, job, delay):
+        due = self.clock() + delay
+        heappush(self.delayed_jobs, (due, next(self.counter), batch, job))
+        batch.delayed += 1
+
+    def release_delayed_jobs(self):
+        while self.delayed_jobs and self.delayed_jobs[0][0] <= self.clock():
+            _, _, batch, job = heappop(self.delayed_jobs)
+            batch.delayed -= 1
+            batch.jobs.appendleft(job)
+            self.spawn_workers()
+            self.condition.notify_all()
+
+    @property
+    def timeout(self):
+        if not self.delayed_jobs:
+            return None
+        return max(self.delayed_jobs[0][0] - self.clock(), 0)
+
+    def next_job(self):
+        self.release_delayed_jobs()
+        for _ in range(len(self.batches)):
+            batch = self.batches[0]
+            self.batches.rotate(-1)
+            if batch.available_slots:
+                batch.running += 1
+                return batch, batch.jobs.popleft()
+        return None, None
+
+    def work(self):
+        while True:
+            with self.condition:
+                batch, job = self.next_job()
+                while not batch:
+                    self.idle_workers += 1
+                    self.condition.wait(self.timeout)
+                    self.idle_workers -= 1
+                    batch, job = self.next_job()
+            try:
+                batch.execute(job)
+            finally:
+                if self.cleanup:
+                    self.cleanup()
+
+
+class Batch:
+    def __init__(self, pool, name, function, iterable, processes):
+        self.pool = pool
+        self.name = name
+        self.function = function
+        self.jobs = deque((index, item, None) for index, item in enumerate(iterable))
+        self.results = [None] * len(self.jobs)
+        self.processes = processes
+        self.running = self.delayed = 0
+        self.exception = None
+        self.detached = False
+        self.done = deque()
+
+    @property
+    def available_slots(self):
+        return min(len(self.jobs), max(self.processes - self.running, 0))
+
+    @property
+    def metrics(self):
+        return {
+            "queued_jobs": len(self.jobs),
+            "running_jobs": self.running,
+            "delayed_jobs": self.delayed,
+            "processes": self.processes,
+        }
+
+    def execute(self, job):
+        index, item, generator = job
+        delay = None
+        try:
+            result = generator or self.function(item)
+            if isgenerator(result):
+                generator, delay = result, next(result)
+            else:
+                self.results[index] = result
+        except StopIteration as stop:
+            self.results[index] = stop.value
+        except Exception as exc:
+            self.exception = self.exception or exc
+            if self.detached:
+                error(f"{self.name} failed:\n{format_exc()}")
+        finally:
+            with self.pool.condition:
+                self.running -= 1
+                if delay is None:
+                    self.pool.completed_jobs += 1
+                    self.done.append((item, self.results[index]))
+                    if self.detached:
+                        self.pool.batches.remove(self)
+                else:
+                    self.pool.delay(self, (index, item, generator), delay)
+                self.pool.condition.notify_all()
+
+    def join(self):
+        while True:
+            with self.pool.condition:
+                self.pool.release_delayed_jobs()
+                while (self.running or self.delayed) and not self.available_slots:
+                    self.pool.condition.wait(self.pool.timeout)
+                    self.pool.release_delayed_jobs()
+                if not self.jobs:
+                    return
+                self.running += 1
+                job = self.jobs.popleft()
+            self.execute(job)
+
+    def submit(self, item):
+        with self.pool.condition:
+            self.jobs.append((len(self.results), item, None))
+            self.results.append(None)
+            self.pool.spawn_workers()
+            self.pool.condition.notify_all()
+
+    def cancel(self):
+        with self.pool.condition:
+            jobs, self.jobs = self.jobs, deque()
+        return [item for _, item, _ in jobs]
+
+    def next_completed(self, timeout=None):
+        deadline = None if timeout is None else time() + timeout
+        while True:
+            with self.pool.condition:
+                self.pool.release_delayed_jobs()
+                while not self.done and not self.available_slots:
+                    if not self.running and not self.delayed:
+                        return None
+                    if deadline is not None and time() >= deadline:
+                        return None
+                    timeouts = [self.pool.timeout]
+                    if deadline is not None:
+                        timeouts.append(max(deadline - time(), 0))
+                    timeouts = [timeout for timeout in timeouts if timeout is not None]
+                    self.pool.condition.wait(min(timeouts, default=None))
+                    self.pool.release_delayed_jobs()
+                if self.exception:
+                    raise self.exception
+                if self.done:
+                    return self.done.popleft()
+                self.running += 1
+                job = self.jobs.popleft()
+            self.execute(job)
+
+
+class ProcessPool:
+    def __init__(self, max_workers, initializer=None):
+        self.max_workers = max_workers
+        self.initializer = initializer
+        self.executor = None
+        self.lock = Lock()
+
+    def get_executor(self):
+        with self.lock:
+            if not self.executor:
+                self.executor = ProcessPoolExecutor(
+                    self.max_workers,
+                    mp_context=get_context("fork"),
+                    initializer=self.initializer,
+                )
+            return self.executor
+
+    def imap(self, function, iterable, processes, stop=None):
+        executor, jobs = self.get_executor(), iter(iterable)
+        try:
+            futures = {
+                executor.submit(function, job) for _, job in zip(range(processes), jobs)
+            }
+            while futures:
+                done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = None if stop and stop() else next(jobs, None)
+                    if job is not None:
+                        futures.add(executor.submit(function, job))
+                    yield future.result()
+        except BrokenProcessPool:
+            with self.lock:
+                if self.executor is executor:
+                    self.executor = None
+            raise
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import scoped_session, sessionmaker
 
@@ -24,3 +24,19 @@ if DIALECT == "mysql":
 engine = create_engine(DATABASE_URL, **engine_parameters)
 Session = scoped_session(sessionmaker(autoflush=False, bind=engine))
 Base = declarative_base()
+
+
+def reset_connection_pool():
+    engine.pool = engine.pool.recreate()
+    Session.registry.clear()
+
+
+def create_indexes(bind=engine):
+    inspector = inspect(bind)
+    for table in Base.metadata.sorted_tables:
+        existing_indexes = {
+            tuple(index["column_names"]) for index in inspector.get_indexes(table.name)
+        }
+        for index in table.indexes:
+            if tuple(column.name for column in index.columns) not in existing_indexes:
+                index.create(bind=bind)
@@ -5,69 +5,69 @@ from eNMS.database import Base
 service_device_table = Table(
     "service_device_association",
     Base.metadata,
-    Column("device_id", Integer, ForeignKey("device.id")),
-    Column("service_id", Integer, ForeignKey("service.id")),
+    Column("device_id", Integer, ForeignKey("device.id"), index=True),
+    Column("service_id", Integer, ForeignKey("service.id"), index=True),
 )
 
 service_pool_table = Table(
     "service_pool_association",
     Base.metadata,
-    Column("pool_id", Integer, ForeignKey("pool.id")),
-    Column("service_id", Integer, ForeignKey("service.id")),
+    Column("pool_id", Integer, ForeignKey("pool.id"), index=True),
+    Column("service_id", Integer, ForeignKey("service.id"), index=True),
 )
 
 run_device_table = Table(
     "run_device_association",
     Base.metadata,
-    Column("device_id", Integer, ForeignKey("device.id")),
-    Column("run_id", Integer, ForeignKey("run.id", ondelete="cascade")),
+    Column("device_id", Integer, ForeignKey("device.id"), index=True),
+    Column("run_id", Integer, ForeignKey("run.id", ondelete="cascade"), index=True),
 )
 
 run_pool_table = Table(
     "run_pool_association",
     Base.metadata,
-    Column("pool_id", Integer, ForeignKey("pool.id")),
-    Column("run_id", Integer, ForeignKey("run.id", ondelete="cascade")),
+    Column("pool_id", Integer, ForeignKey("pool.id"), index=True),
+    Column("run_id", Integer, ForeignKey("run.id", ondelete="cascade"), index=True),
 )
 
 task_device_table = Table(
     "task_device_association",
     Base.metadata,
-    Column("device_id", Integer, ForeignKey("device.id")),
-    Column("task_id", Integer, ForeignKey("task.id")),
+    Column("device_id", Integer, ForeignKey("device.id"), index=True),
+    Column("task_id", Integer, ForeignKey("task.id"), index=True),
 )
 
 task_pool_table = Table(
     "task_pool_association",
     Base.metadata,
-    Column("pool_id", Integer, ForeignKey("pool.id")),
-    Column("task_id", Integer, ForeignKey("task.id")),
+    Column("pool_id", Integer, ForeignKey("pool.id"), index=True),
+    Column("task_id", Integer, ForeignKey("task.id"), index=True),
 )
 
 service_workflow_table = Table(
     "service_workflow_association",
     Base.metadata,
-    Column("service_id", Integer, ForeignKey("service.id")),
-    Column("workflow_id", Integer, ForeignKey("workflow.id")),
+    Column("service_id", Integer, ForeignKey("service.id"), index=True),
+    Column("workflow_id", Integer, ForeignKey("workflow.id"), index=True),
 )
 
 pool_device_table = Table(
     "pool_device_association",
     Base.metadata,
-    Column("pool_id", Integer, ForeignKey("pool.id")),
-    Column("device_id", Integer, ForeignKey("device.id")),
+    Column("pool_id", Integer, ForeignKey("pool.id"), index=True),
+    Column("device_id", Integer, ForeignKey("device.id"), index=True),
 )
 
 pool_link_table = Table(
     "pool_link_association",
     Base.metadata,
-    Column("pool_id", Integer, ForeignKey("pool.id")),
-    Column("link_id", Integer, ForeignKey("link.id")),
+    Column("pool_id", Integer, ForeignKey("pool.id"), index=True),
+    Column("link_id", Integer, ForeignKey("link.id"), index=True),
 )
 
 pool_user_table = Table(
     "pool_user_association",
     Base.metadata,
-    Column("pool_id", Integer, ForeignKey("pool.id")),
-    Column("user_id", Integer, ForeignKey("user.id")),
+    Column("pool_id", Integer, ForeignKey("pool.id"), index=True),
+    Column("user_id", Integer, ForeignKey("user.id"), index=True),
 )
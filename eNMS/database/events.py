@@ -77,6 +77,33 @@ def configure_events(app):
             name, changes = getattr(target, "name", target.id), " | ".join(changelog)
             app.log("info", f"UPDATE: {target.type} '{name}': ({changes})")
 
+    @event.listens_for(Base, "after_insert", propagate=True)
+    @event.listens_for(Base, "after_delete", propagate=True)
+    def invalidate_table_counts(mapper, connection, target):
+        for table in mapper.tables:
+            app.table_counts.invalidate(table.name)
+
+    @event.listens_for(Base, "after_update", propagate=True)
+    def invalidate_filtered_counts(mapper, connection, target):
+        for table in mapper.tables:
+            app.table_counts.invalidate(table.name, total=False)
+
+    @event.listens_for(models["run"], "after_delete")
+    def delete_run_logs(mapper, connection, target):
+        if target.runtime == target.parent_runtime:
+            app.run_logs.remove(target.runtime)
+
+    @event.listens_for(models["result"], "before_delete")
+    def delete_result_logs(mapper, connection, target):
+        if isinstance(target.result.get("logs"), str):
+            app.run_logs.remove(target.parent_runtime)
+
+    @event.listens_for(models["workflow_edge"], "after_insert")
+    @event.listens_for(models["workflow_edge"], "after_update")
+    @event.listens_for(models["workflow_edge"], "after_delete")
+    def invalidate_workflow_graph(mapper, connection, target):
+        app.workflow_graphs.pop(target.workflow_id, None)
+
     if app.config["vault"]["active"]:
 
         @event.listens_for(models["service"].name, "set", propagate=True)
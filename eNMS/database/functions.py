@@ -1,7 +1,7 @@
 from re import search
 from sqlalchemy import func
 
-from eNMS.database import Session
+from eNMS.database import DIALECT, Session
 from eNMS.models import models
 
 
@@ -21,6 +21,28 @@ def fetch_all(model, **kwargs):
     return fetch(model, allow_none=True, all_matches=True, **kwargs)
 
 
+def chunks(values, chunk_size=500):
+    for start in range(0, len(values), chunk_size):
+        end = start + chunk_size
+        yield values[start:end]
+
+
+def collation_key(value):
+    if DIALECT == "mysql" and isinstance(value, str):
+        return value.lower().rstrip(" ")
+    return value
+
+
+def fetch_in(model, property, values, chunk_size=500):
+    values, instances = list(dict.fromkeys(values)), {}
+    column = getattr(models[model], property)
+    for chunk in chunks(values, chunk_size):
+        for instance in Session.query(models[model]).filter(column.in_(chunk)):
+            instances.setdefault(collation_key(getattr(instance, property)), instance)
+    not_found = [value for value in values if collation_key(value) not in instances]
+    return list(instances.values()), not_found
+
+
 def count(model, **kwargs):
     return Session.query(func.count(models[model].id)).filter_by(**kwargs).scalar()
 
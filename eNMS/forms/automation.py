@@ -53,6 +53,8 @@ class ServiceForm(BaseForm):
     mail_recipient = StringField("Mail Recipients (separated by comma)")
     number_of_retries = IntegerField("Number of retries", default=0)
     time_between_retries = IntegerField("Time between retries (in seconds)", default=10)
+    exponential_backoff = BooleanField("Exponential Backoff")
+    jitter = BooleanField("Random Jitter")
     maximum_runs = IntegerField("Maximum number of runs", default=1)
     skip = BooleanField("Skip")
     skip_query = PythonField("Skip Query (Python)")
@@ -71,6 +73,14 @@ class ServiceForm(BaseForm):
     result_postprocessing = CodeField(widget=TextArea(), render_kw={"rows": 8})
     multiprocessing = BooleanField("Multiprocessing")
     max_processes = IntegerField("Maximum number of processes", default=50)
+    multiprocessing_mode = SelectField(
+        "Multiprocessing Mode",
+        choices=(
+            ("thread", "Threads (I/O bound services)"),
+            ("process", "Processes (CPU bound services)"),
+            ("asyncio", "Asyncio (services with an asynchronous job)"),
+        ),
+    )
     conversion_method = SelectField(
         choices=(
             ("none", "No conversion"),
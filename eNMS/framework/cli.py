@@ -1,9 +1,12 @@
 from click import argument, echo, option
 from json import loads
+from os import getpid
+from socket import gethostname
 
 from eNMS import app
+from eNMS.controller.executor import RunExecutor
 from eNMS.database import Session
-from eNMS.database.functions import delete, factory, fetch
+from eNMS.database.functions import delete, factory, fetch, fetch_in
 
 
 def configure_cli(flask_app):
@@ -38,11 +41,33 @@ def configure_cli(flask_app):
     @option("--devices")
     @option("--payload")
     def start(name, devices, payload):
-        devices_list = devices.split(",") if devices else []
-        devices_list = [fetch("device", name=name).id for name in devices_list]
+        devices_list, not_found = fetch_in(
+            "device", "name", devices.split(",") if devices else []
+        )
+        if not_found:
+            raise Exception(f"There is no device named {', '.join(not_found)}")
+        devices_list = [device.id for device in devices_list]
         payload_dict = loads(payload) if payload else {}
         payload_dict["devices"] = devices_list
         service = fetch("service", name=name)
         results = app.run(service.id, **payload_dict)
         Session.commit()
         echo(app.str_dict(results))
+
+    @flask_app.cli.command(name="executor")
+    @option("--name", default=lambda: f"{gethostname()}-{getpid()}")
+    @option("--max-runs", type=int)
+    def executor(name, max_runs):
+        settings = app.config["automation"]["executor"]
+        if not app.run_queue:
+            raise Exception("The executor requires the 'queue' executor mode.")
+        echo(f"Executor {name} waiting for runs")
+        RunExecutor(
+            app.run_queue,
+            app.run,
+            name,
+            max_runs or settings["max_runs"],
+            settings["poll_interval"],
+            settings["lease_time"],
+            cleanup=Session.remove,
+        ).serve()
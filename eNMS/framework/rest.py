@@ -6,7 +6,7 @@ from uuid import getnode
 
 from eNMS import app
 from eNMS.database import Session
-from eNMS.database.functions import delete, factory, fetch
+from eNMS.database.functions import delete, factory, fetch, fetch_in
 from eNMS.framework.extensions import auth, csrf
 
 
@@ -129,18 +129,15 @@ class RunService(Resource):
             devices, pools = [], []
             service = fetch("service", name=data["name"])
             handle_asynchronously = data.get("async", False)
-            for device_name in data.get("devices", ""):
-                device = fetch("device", name=device_name)
-                if device:
-                    devices.append(device.id)
-                else:
-                    errors.append(f"No device with the name '{device_name}'")
-            for device_ip in data.get("ip_addresses", ""):
-                device = fetch("device", ip_address=device_ip)
-                if device:
-                    devices.append(device.id)
-                else:
-                    errors.append(f"No device with the IP address '{device_ip}'")
+            for property, values, label in (
+                ("name", data.get("devices", ""), "name"),
+                ("ip_address", data.get("ip_addresses", ""), "IP address"),
+            ):
+                instances, not_found = fetch_in("device", property, values)
+                devices.extend(device.id for device in instances)
+                errors.extend(
+                    f"No device with the {label} '{value}'" for value in not_found
+                )
             for pool_name in data.get("pools", ""):
                 pool = fetch("pool", name=pool_name)
                 if pool:
@@ -155,10 +152,13 @@ class RunService(Resource):
         if devices or pools:
             data.update({"devices": devices, "pools": pools})
         data["runtime"] = runtime = app.get_time()
-        if handle_asynchronously:
+        if handle_asynchronously and app.run_queue:
+            app.run_queue.enqueue(service.id, data)
+            return {"errors": errors, "runtime": runtime}
+        elif handle_asynchronously:
             app.scheduler.add_job(
                 id=runtime,
-                func=app.run,
+                func=app.start_run,
                 run_date=datetime.now(),
                 args=[service.id],
                 kwargs=data,
@@ -19,30 +19,7 @@ class Server(AbstractBase):
     cpu_load = Column(Float)
 
     def generate_row(self, **kwargs):
-        return super().generate_row() + [
-            f"""<center>
-            <ul class="pagination pagination-lg" style="margin: 0px;">
-          <li>
-            <button type="button" class="btn btn-primary"
-            onclick="showTypePanel('server', '{self.id}')" data-tooltip="Edit"
-              ><span class="glyphicon glyphicon-edit"></span
-            ></button>
-          </li>
-          <li>
-            <button type="button" class="btn btn-primary"
-            onclick="showTypePanel('server', '{self.id}', 'duplicate')"
-            data-tooltip="Duplicate"
-              ><span class="glyphicon glyphicon-duplicate"></span
-            ></button>
-          </li>
-          <li>
-            <button type="button" class="btn btn-danger"
-            onclick="showDeletionPanel({self.row_properties})" data-tooltip="Delete"
-              ><span class="glyphicon glyphicon-trash"></span
-            ></button>
-          </li>
-        </ul></center>"""
-        ]
+        return super().generate_row() + [self.row_properties]
 
 
 class User(AbstractBase, UserMixin):
@@ -56,30 +33,7 @@ class User(AbstractBase, UserMixin):
     password = Column(SmallString)
 
     def generate_row(self, **kwargs):
-        return super().generate_row() + [
-            f"""<center>
-            <ul class="pagination pagination-lg" style="margin: 0px;">
-          <li>
-            <button type="button" class="btn btn-primary"
-            onclick="showTypePanel('user', '{self.id}')" data-tooltip="Edit"
-              ><span class="glyphicon glyphicon-edit"></span
-            ></button>
-          </li>
-          <li>
-            <button type="button" class="btn btn-primary"
-            onclick="showTypePanel('user', '{self.id}', 'duplicate')"
-            data-tooltip="Duplicate"
-              ><span class="glyphicon glyphicon-duplicate"></span
-            ></button>
-          </li>
-          <li>
-            <button type="button" class="btn btn-danger"
-            onclick="showDeletionPanel({self.row_properties})" data-tooltip="Delete"
-              ><span class="glyphicon glyphicon-trash"></span
-            ></button>
-          </li>
-        </ul></center>"""
-        ]
+        return super().generate_row() + [self.row_properties]
 
     @property
     def is_admin(self):
@@ -30,6 +30,8 @@ class Service(AbstractBase):
     description = Column(SmallString)
     number_of_retries = Column(Integer, default=0)
     time_between_retries = Column(Integer, default=10)
+    exponential_backoff = Column(Boolean, default=False)
+    jitter = Column(Boolean, default=False)
     positions = Column(MutableDict)
     tasks = relationship("Task", back_populates="service", cascade="all,delete")
     events = relationship("Event", back_populates="service", cascade="all,delete")
@@ -67,6 +69,7 @@ class Service(AbstractBase):
     maximum_runs = Column(Integer, default=1)
     multiprocessing = Column(Boolean, default=False)
     max_processes = Column(Integer, default=5)
+    multiprocessing_mode = Column(SmallString, default="thread")
     conversion_method = Column(SmallString, default="none")
     validation_method = Column(SmallString, default="none")
     content_match = Column(LargeString, default="")
@@ -119,64 +122,11 @@ class Service(AbstractBase):
             getattr(self, f"table_{property}", getattr(self, property))
             for property in table_properties["service"][1:]
         ]
-        if self.type == "workflow":
-            onclick = f"switchToWorkflow('{self.id}')"
-            rows[0] = f"""<b><a href="#" onclick="{onclick}">{rows[0]}</a></b>"""
         return rows + [
-            f"Running" if app.service_db[self.id]["runs"] else "Idle",
-            f"""
-            <ul class="pagination pagination-lg" style="margin: 0px; width: 350px">
-          <li>
-            <button type="button" class="btn btn-info"
-            onclick="showRuntimePanel('results', {self.row_properties})"
-            data-tooltip="Results"><span class="glyphicon glyphicon-list-alt"></span
-            ></button>
-          </li>
-          <li>
-            <button type="button" class="btn btn-info"
-            onclick="showRuntimePanel('logs', {self.row_properties})"
-            data-tooltip="Logs"><span class="glyphicon glyphicon-list"></span
-            ></button>
-          </li>
-          <li>
-            <button type="button" class="btn btn-success"
-            onclick="normalRun('{self.id}')" data-tooltip="Run"
-              ><span class="glyphicon glyphicon-play"></span
-            ></button>
-          </li>
-          <li>
-            <button type="button" class="btn btn-success"
-            onclick="showTypePanel('{self.type}', '{self.id}', 'run')"
-            data-tooltip="Parameterized Run"
-              ><span class="glyphicon glyphicon-play-circle"></span
-            ></button>
-          </li>
-          <li>
-            <button type="button" class="btn btn-primary"
-            onclick="showTypePanel('{self.type}', '{self.id}')" data-tooltip="Edit"
-              ><span class="glyphicon glyphicon-edit"></span
-            ></button>
-          </li>
-          <li>
-            <button type="button" class="btn btn-primary"
-            onclick="exportService('{self.id}')" data-tooltip="Export"
-              ><span class="glyphicon glyphicon-download"></span
-            ></button>
-          </li>
-          <li>
-            <button type="button" class="btn btn-danger"
-            onclick="showDeletionPanel({self.row_properties})" data-tooltip="Delete"
-              ><span class="glyphicon glyphicon-trash"></span
-            ></button>
-          </li>
-        </ul>""",
+            "Running" if self.id in kwargs["running_services"] else "Idle",
+            self.row_properties,
         ]
 
-    def adjacent_services(self, workflow, direction, subtype):
-        for edge in getattr(self, f"{direction}s"):
-            if edge.subtype == subtype and edge.workflow == workflow:
-                yield getattr(edge, direction), edge
-
 
 class ConnectionService(Service):
 
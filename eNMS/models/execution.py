@@ -1,33 +1,43 @@
+from asyncio import gather, new_event_loop, Semaphore, sleep as async_sleep
 from builtins import __dict__ as builtins
 from collections import defaultdict
 from copy import deepcopy
 from datetime import datetime
-from functools import partial
+from functools import lru_cache, partial
+from inspect import isgenerator
 from json import dumps, loads
 from json.decoder import JSONDecodeError
-from multiprocessing.pool import ThreadPool
 from napalm import get_network_driver
 from netmiko import ConnectHandler
 from os import environ
 from paramiko import SFTPClient
+from random import uniform
 from ruamel import yaml
 from re import compile, search
 from requests import post
 from scp import SCPClient
 from slackclient import SlackClient
-from sqlalchemy import Boolean, ForeignKey, Integer
+from sqlalchemy import Boolean, ForeignKey, Index, inspect, Integer, select, union
 from sqlalchemy.ext.associationproxy import association_proxy
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import joinedload, load_only, relationship
+from threading import Lock
 from time import sleep
 from traceback import format_exc
+from types import MappingProxyType
 from xmltodict import parse
 from xml.parsers.expat import ExpatError
 
 from eNMS import app
 from eNMS.database import Session
-from eNMS.database.associations import run_pool_table, run_device_table
+from eNMS.database.associations import (
+    pool_device_table,
+    run_device_table,
+    run_pool_table,
+    service_device_table,
+    service_pool_table,
+)
 from eNMS.database.dialect import Column, MutableDict, SmallString
-from eNMS.database.functions import factory, fetch
+from eNMS.database.functions import chunks, factory, fetch, fetch_in
 from eNMS.database.base import AbstractBase
 from eNMS.models import models
 
@@ -35,6 +45,11 @@ from eNMS.models import models
 class Result(AbstractBase):
 
     __tablename__ = type = "result"
+    __table_args__ = (
+        Index("ix_result_lookup", "parent_runtime", "service_id", "device_id"),
+        Index("ix_result_run", "run_id", "device_id"),
+        Index("ix_result_service_runtime", "service_id", "runtime"),
+    )
     private = True
     id = Column(Integer, primary_key=True)
     success = Column(Boolean, default=False)
@@ -70,27 +85,17 @@ class Result(AbstractBase):
         super().__init__(**kwargs)
         self.parent_runtime = self.run.parent_runtime
 
-    @property
-    def table_success(self):
-        btn = "success" if self.success else "danger"
-        label = "Success" if self.success else "Failure"
-        return (
-            f'<button type="button" class="btn btn-{btn} btn-sm"'
-            f'style="width:100%">{label}</button>'
-        )
-
     def generate_row(self, **kwargs):
-        return super().generate_row() + [
-            f"""<button type="button" class="btn btn-info btn-sm"
-            onclick="showResult('{self.id}')">Results</button>""",
-            f"""<input type="radio" name="v1" value="{self.id}"/>""",
-            f"""<input type="radio" name="v2" value="{self.id}"/>""",
-        ]
+        return super().generate_row() + [{"id": self.id}]
 
 
 class Run(AbstractBase):
 
     __tablename__ = type = "run"
+    __table_args__ = (
+        Index("ix_run_parent_runtime", "parent_runtime", "service_id"),
+        Index("ix_run_service_status", "service_id", "status"),
+    )
     private = True
     id = Column(Integer, primary_key=True)
     restart_run_id = Column(Integer, ForeignKey("run.id"))
@@ -99,7 +104,7 @@ class Run(AbstractBase):
     properties = Column(MutableDict)
     success = Column(Boolean, default=False)
     status = Column(SmallString, default="Running")
-    runtime = Column(SmallString)
+    runtime = Column(SmallString, index=True)
     duration = Column(SmallString)
     parent_id = Column(Integer, ForeignKey("run.id"))
     parent = relationship(
@@ -124,6 +129,8 @@ class Run(AbstractBase):
     task = relationship("Task", foreign_keys="Run.task_id")
     state = Column(MutableDict)
     results = relationship("Result", back_populates="run", cascade="all, delete-orphan")
+    device_ids = ()
+    dictionary_matcher = parameters = None
 
     def __init__(self, **kwargs):
         self.runtime = kwargs.get("runtime") or app.get_time()
@@ -144,6 +151,8 @@ class Run(AbstractBase):
     def __getattr__(self, key):
         if key in self.__dict__:
             return self.__dict__[key]
+        elif self.parameters is not None and key in self.parameters:
+            return self.parameters[key]
         elif key in self.__dict__.get("properties", {}):
             return self.__dict__["properties"][key]
         elif self.__dict__.get("service_id"):
@@ -151,41 +160,55 @@ class Run(AbstractBase):
         else:
             raise AttributeError
 
+    @property
+    def result_cache(self):
+        return self.__dict__.setdefault("_result_cache", {})
+
     def result(self, device=None):
-        result = [r for r in self.results if r.device_name == device]
-        return result.pop() if result else None
+        return self.fetch_result(
+            self.parent_runtime, models["result"].run_id == self.id, device=device
+        )
+
+    def fetch_result(self, parent_runtime, *filters, device=None):
+        result_model, device_model = models["result"], models["device"]
+        query = Session.query(result_model).filter(
+            result_model.parent_runtime == parent_runtime, *filters
+        )
+        if device:
+            query = query.join(
+                device_model, result_model.device_id == device_model.id
+            ).filter(device_model.name == device)
+        else:
+            query = query.filter(result_model.device_id.is_(None))
+        return (
+            query.options(load_only("result")).order_by(result_model.id.desc()).first()
+        )
 
     def generate_row(self, **kwargs):
         return super().generate_row() + [
-            f"""
-            <ul class="pagination pagination-lg" style="margin: 0px; width: 100px">
-          <li>
-            <button type="button" class="btn btn-info"
-            onclick="showRuntimePanel('results', {self.service.row_properties},
-            '{self.runtime}')"data-tooltip="Results">
-            <span class="glyphicon glyphicon-list-alt"></span></button>
-          </li>
-          <li>
-            <button type="button" class="btn btn-info"
-            onclick="showRuntimePanel('logs', {self.service.row_properties},
-            '{self.runtime}')"data-tooltip="Logs">
-            <span class="glyphicon glyphicon-list"></span></button>
-          </li>
-        </ul>"""
+            {"runtime": self.runtime, "service": self.service.row_properties}
         ]
 
+    @property
+    def parent_state(self):
+        if self.parent_runtime not in app.run_db:
+            state = app.run_state_store.get(self.parent_runtime)
+            if state:
+                return state
+        return app.run_db[self.parent_runtime]
+
     @property
     def run_state(self):
         if self.state:
             return self.state
         elif self.runtime == self.parent_runtime:
-            return app.run_db[self.runtime]
+            return self.parent_state
         else:
-            return app.run_db[self.parent_runtime]["services"][self.path]
+            return self.parent_state["services"][self.path]
 
     @property
     def edge_state(self):
-        return app.run_db[self.parent_runtime]["edges"]
+        return self.parent_state["edges"]
 
     @property
     def stop(self):
@@ -207,34 +230,84 @@ class Run(AbstractBase):
 
     def compute_devices_from_query(_self, query, property, **locals):  # noqa: N805
         values = _self.eval(query, **locals)
-        devices, not_found = set(), []
         if isinstance(values, str):
             values = [values]
-        for value in values:
-            device = fetch("device", allow_none=True, **{property: value})
-            if device:
-                devices.add(device)
-            else:
-                not_found.append(value)
+        devices, not_found = fetch_in("device", property, values)
         if not_found:
             raise Exception(f"Device query invalid targets: {', '.join(not_found)}")
-        return devices
+        return set(devices)
+
+    @staticmethod
+    def get_target_ids(device_table, pool_table, key, value):
+        pool_devices = pool_device_table.join(
+            pool_table, pool_device_table.c.pool_id == pool_table.c.pool_id
+        )
+        query = union(
+            select([device_table.c.device_id]).where(device_table.c[key] == value),
+            select([pool_device_table.c.device_id])
+            .select_from(pool_devices)
+            .where(pool_table.c[key] == value),
+        )
+        return {device_id for device_id, in Session.execute(query)}
 
     def compute_devices(self, payload):
-        devices = set(self.devices)
-        for pool in self.pools:
-            devices |= set(pool.devices)
+        Session.flush()
+        devices = self.get_target_ids(
+            run_device_table, run_pool_table, "run_id", self.id
+        )
         if not devices:
             if self.service.device_query:
-                devices |= self.compute_devices_from_query(
-                    self.service.device_query,
-                    self.service.device_query_property,
-                    payload=payload,
-                )
-            devices |= set(self.service.devices)
-            for pool in self.service.pools:
-                devices |= set(pool.devices)
-        return list(devices)
+                devices |= {
+                    device.id
+                    for device in self.compute_devices_from_query(
+                        self.service.device_query,
+                        self.service.device_query_property,
+                        payload=payload,
+                    )
+                }
+            devices |= self.get_target_ids(
+                service_device_table, service_pool_table, "service_id", self.service.id
+            )
+        return sorted(devices)
+
+    def set_devices(self, device_ids):
+        table = run_device_table
+        Session.execute(table.delete().where(table.c.run_id == self.id))
+        if device_ids:
+            Session.execute(
+                table.insert(),
+                [{"run_id": self.id, "device_id": device} for device in device_ids],
+            )
+        Session.expire(self, ["devices"])
+        self.device_ids = device_ids
+
+    def get_devices(self):
+        for chunk in chunks(self.device_ids):
+            yield from Session.query(models["device"]).filter(
+                models["device"].id.in_(chunk)
+            )
+
+    def load_devices(self, device_ids):
+        session = Session.session_factory()
+        try:
+            devices = (
+                session.query(models["device"])
+                .filter(models["device"].id.in_(device_ids))
+                .all()
+            )
+            session.expunge_all()
+        finally:
+            session.close()
+        return {device.id: device for device in devices}
+
+    def run_device_job(self, payload, device_id):
+        with self.devices_lock:
+            if device_id not in self.loaded_devices:
+                index = self.device_ids.index(device_id)
+                chunk = next(chunks(self.device_ids[index:]))
+                self.loaded_devices.update(self.load_devices(chunk))
+            device = self.loaded_devices.pop(device_id)
+        return self.delayed_results(payload, device)
 
     def init_state(self):
         state = {
@@ -260,19 +333,43 @@ class Run(AbstractBase):
             if self.runtime in app.run_db:
                 return
             app.run_db[self.runtime] = state
+            app.run_state_store.watch(self.runtime, state)
         else:
             service_states = app.run_db[self.parent_runtime]["services"]
             if self.path not in service_states:
                 service_states[self.path] = state
 
+    def freeze_parameters(self):
+        parameters = {
+            column.key: getattr(self.service, column.key)
+            for column in inspect(self.service).mapper.column_attrs
+        }
+        parameters.update(self.properties or {})
+        self.parameters = MappingProxyType(parameters)
+
     def run(self, payload):
+        return run_to_completion(self.delayed_run(payload))
+
+    def start(self, payload):
+        job, runtime = self.delayed_run(payload), self.runtime
+        try:
+            delay = next(job)
+        except StopIteration as stop:
+            return stop.value
+        session = Session()
+        Session.registry.clear()
+        app.worker_pool.park(runtime, session_bound(job, session), delay)
+        return {"runtime": runtime, "parked": True}
+
+    def delayed_run(self, payload):
+        self.freeze_parameters()
         self.init_state()
         self.run_state["status"] = "Running"
         start = datetime.now().replace(microsecond=0)
         try:
-            app.service_db[self.service.id]["runs"] += 1
+            app.run_state_store.add_service_run(self.service.id, 1)
             Session.commit()
-            results = self.device_run(payload)
+            results = yield from self.device_run(payload)
         except Exception:
             result = (
                 f"Running {self.service.type} '{self.service.name}'"
@@ -283,7 +380,7 @@ class Run(AbstractBase):
             self.log("error", result)
             results = {"success": False, "runtime": self.runtime, "result": result}
         finally:
-            Session.commit()
+            app.result_writer.flush()
             results["summary"] = self.run_state.get("summary", None)
             self.status = "Aborted" if self.stop else "Completed"
             self.run_state["status"] = self.status
@@ -291,13 +388,15 @@ class Run(AbstractBase):
                 self.success = self.run_state["success"] = results["success"]
             if self.send_notification:
                 results = self.notify(results)
-            app.service_db[self.service.id]["runs"] -= 1
+            app.run_state_store.add_service_run(self.service.id, -1)
             results["duration"] = self.duration = str(
                 datetime.now().replace(microsecond=0) - start
             )
-            results["logs"] = app.run_logs.pop(self.runtime, [])
             if self.runtime == self.parent_runtime:
+                results["logs"] = app.run_logs.close(self.runtime)
                 self.state = results["state"] = app.run_db.pop(self.runtime)
+                app.run_state_store.unwatch(self.runtime)
+                self.release_connections()
             if self.task and not self.task.frequency:
                 self.task.is_active = False
             results["properties"] = {
@@ -306,19 +405,24 @@ class Run(AbstractBase):
             }
             if (
                 self.runtime == self.parent_runtime
-                or len(self.devices) > 1
+                or len(self.device_ids) > 1
                 or self.run_method == "once"
             ):
                 self.create_result(results)
-            Session.commit()
+            app.result_writer.flush()
         return results
 
     @staticmethod
     def get_device_result(args):
-        device_id, runtime, payload, results = args
+        job = Run.delayed_device_result(*args)
+        return session_bound(job, Session.session_factory())
+
+    @staticmethod
+    def delayed_device_result(device_id, runtime, payload):
         device = fetch("device", id=device_id)
         run = fetch("run", runtime=runtime)
-        results.append(run.get_results(payload, device))
+        run.freeze_parameters()
+        return (yield from run.delayed_results(payload, device))
 
     def device_iteration(self, payload, device):
         derived_devices = self.compute_devices_from_query(
@@ -339,14 +443,15 @@ class Run(AbstractBase):
             },
         )
         derived_run.properties = self.properties
-        success = derived_run.run(payload)["success"]
+        success = (yield from derived_run.delayed_run(payload))["success"]
         key = "success" if success else "failure"
         self.run_state["summary"][key].append(device.name)
         return success
 
     def device_run(self, payload):
-        self.devices = self.compute_devices(payload)
-        self.run_state["progress"]["device"]["total"] += len(self.devices)
+        self.set_devices(self.compute_devices(payload))
+        Session.commit()
+        self.run_state["progress"]["device"]["total"] += len(self.device_ids)
         if self.iteration_devices and not self.parent_device:
             if not self.workflow:
                 return {
@@ -354,74 +459,147 @@ class Run(AbstractBase):
                     "result": "Device iteration not allowed outside of a workflow",
                     "runtime": self.runtime,
                 }
-            results = [
-                self.device_iteration(payload, device) for device in self.devices
-            ]
+            results = []
+            for device in self.get_devices():
+                results.append((yield from self.device_iteration(payload, device)))
             return {"success": all(results), "runtime": self.runtime}
         elif self.run_method != "per_device":
-            return self.get_results(payload)
+            return (yield from self.delayed_results(payload))
         else:
-            if self.multiprocessing and len(self.devices) > 1:
-                results = []
-                processes = min(len(self.devices), self.max_processes)
-                process_args = [
-                    (device.id, self.runtime, payload, results)
-                    for device in self.devices
-                ]
-                pool = ThreadPool(processes=processes)
-                pool.map(self.get_device_result, process_args)
-                pool.close()
-                pool.join()
+            if self.multiprocessing and self.multiprocessing_mode == "process":
+                results = self.device_process_run(payload)
+            elif (
+                self.multiprocessing
+                and self.multiprocessing_mode == "asyncio"
+                and hasattr(self.service, "async_job")
+            ):
+                results = self.device_async_run(payload)
+            elif self.multiprocessing and len(self.device_ids) > 1:
+                results = self.device_thread_run(payload)
             else:
-                results = [self.get_results(payload, device) for device in self.devices]
+                results = []
+                for device in self.get_devices():
+                    results.append((yield from self.delayed_results(payload, device)))
             return {
                 "success": all(result["success"] for result in results),
                 "runtime": self.runtime,
             }
 
+    def device_thread_run(self, payload):
+        if self.service.type == "workflow":
+            function = self.get_device_result
+            jobs = [(device_id, self.runtime, payload) for device_id in self.device_ids]
+        else:
+            run, jobs = self.get_context(), self.device_ids
+            function = partial(run.run_device_job, payload)
+        return app.worker_pool.map(self.runtime, function, jobs, self.max_processes)
+
+    def get_context(self):
+        Session.commit()
+        session = Session.session_factory()
+        try:
+            run = (
+                session.query(models["run"])
+                .options(
+                    joinedload(models["run"].service),
+                    joinedload(models["run"].workflow),
+                    joinedload(models["run"].parent_device),
+                    joinedload(models["run"].restart_run),
+                )
+                .filter_by(id=self.id)
+                .one()
+            )
+            for column in inspect(run.service).mapper.column_attrs:
+                getattr(run.service, column.key)
+            session.expunge_all()
+        finally:
+            session.close()
+        run.device_ids, run.loaded_devices = self.device_ids, {}
+        run.parameters = self.parameters
+        run.devices_lock = Lock()
+        return run
+
+    def device_process_run(self, payload):
+        Session.commit()
+        results = []
+        for device_name, device_results, logs, variables in app.process_pool.imap(
+            get_process_result,
+            [(device_id, self.runtime, payload) for device_id in self.device_ids],
+            self.max_processes,
+            stop=lambda: self.stop,
+        ):
+            app.run_logs.extend(self.parent_runtime, logs)
+            self.update_progress(device_results, device_name)
+            self.merge_variables(payload, variables, device_name)
+            results.append(device_results)
+        return results
+
+    def device_async_run(self, payload):
+        loop = new_event_loop()
+        try:
+            return loop.run_until_complete(self.async_run(payload))
+        finally:
+            loop.close()
+
+    async def async_run(self, payload):
+        semaphore = Semaphore(self.max_processes)
+
+        async def get_device_results(device):
+            async with semaphore:
+                return await self.get_async_results(payload, device)
+
+        return await gather(
+            *(get_device_results(device) for device in self.get_devices())
+        )
+
+    def merge_variables(self, payload, variables, device_name):
+        payload_variables = payload.setdefault("variables", {})
+        for name, value in variables.items():
+            if name != "devices":
+                payload_variables[name] = value
+            elif device_name in value:
+                payload_variables.setdefault("devices", {})[device_name] = value[
+                    device_name
+                ]
+
+    def update_progress(self, results, device_name):
+        status = "success" if results["success"] else "failure"
+        self.run_state["progress"]["device"][status] += 1
+        self.run_state["summary"][status].append(device_name)
+
     def create_result(self, results, device=None):
         self.success = results["success"]
-        result_kw = {
-            "run": self,
-            "result": results,
-            "service": self.service_id,
-            "parent_runtime": self.parent_runtime,
-        }
-        if self.workflow_id:
-            result_kw["workflow"] = self.workflow_id
-        if self.parent_device_id:
-            result_kw["parent_device"] = self.parent_device_id
-        if device:
-            result_kw["device"] = device.id
-        factory("result", **result_kw)
+        app.result_writer.add(
+            device,
+            {
+                "success": results["success"],
+                "runtime": results["runtime"],
+                "duration": results["duration"],
+                "result": dict(results),
+                "run_id": self.id,
+                "service_id": self.service_id,
+                "parent_runtime": self.parent_runtime,
+                "workflow_id": self.workflow_id,
+                "parent_device_id": self.parent_device_id,
+                "device_id": device.id if device else None,
+            },
+        )
 
     def run_service_job(self, payload, device):
-        args = (device,) if device else ()
         for retry in range(self.number_of_retries + 1):
             try:
                 if retry:
                     self.log("error", f"RETRY n°{retry}", device)
-                results = self.service.job(self, payload, *args)
-                if device and (
-                    getattr(self, "close_connection", False)
-                    or self.runtime == self.parent_runtime
-                ):
+                results = yield
+                if device and getattr(self, "close_connection", False):
                     self.close_device_connection(device)
-                self.convert_result(results)
-                if "success" not in results:
-                    results["success"] = True
-                try:
-                    self.eval(
-                        self.service.result_postprocessing, function="exec", **locals()
-                    )
-                except SystemExit:
-                    pass
-                if results["success"] and self.validation_method != "none":
-                    self.validate_result(results, payload, device)
+                elif device and self.runtime == self.parent_runtime:
+                    self.close_device_connection(device, release=True)
+                self.process_job_results(results, payload, device)
                 if results["success"]:
                     return results
                 elif retry < self.number_of_retries:
-                    sleep(self.time_between_retries)
+                    yield self.get_retry_delay(retry)
             except Exception:
                 result = (
                     f"Running {self.service.type} '{self.service.name}'"
@@ -433,7 +611,65 @@ class Run(AbstractBase):
                 return {"success": False, "result": result}
         return results
 
+    def get_retry_delay(self, retry):
+        delay = self.time_between_retries
+        if self.exponential_backoff:
+            delay *= 2 ** retry
+        if self.jitter:
+            delay = uniform(delay / 2, delay)
+        return delay
+
+    def process_job_results(self, results, payload, device):
+        self.convert_result(results)
+        if "success" not in results:
+            results["success"] = True
+        try:
+            self.eval(self.service.result_postprocessing, function="exec", **locals())
+        except SystemExit:
+            pass
+        if results["success"] and self.validation_method != "none":
+            self.validate_result(results, payload, device)
+
+    def delayed_results(self, payload, device=None):
+        job, args = self.run_job(payload, device), (device,) if device else ()
+        step, value = job.send, None
+        while True:
+            try:
+                delay = step(value)
+            except StopIteration as stop:
+                return stop.value
+            step, value = job.send, None
+            if delay is not None:
+                yield delay
+                continue
+            try:
+                value = self.service.job(self, payload, *args)
+                if isgenerator(value):
+                    value = yield from value
+            except Exception as exc:
+                step, value = job.throw, exc
+
     def get_results(self, payload, device=None):
+        return run_to_completion(self.delayed_results(payload, device))
+
+    async def get_async_results(self, payload, device):
+        job = self.run_job(payload, device)
+        step, value = job.send, None
+        while True:
+            try:
+                delay = step(value)
+            except StopIteration as stop:
+                return stop.value
+            step, value = job.send, None
+            if delay is not None:
+                await async_sleep(delay)
+                continue
+            try:
+                value = await self.service.async_job(self, payload, device)
+            except Exception as exc:
+                step, value = job.throw, exc
+
+    def run_job(self, payload, device=None):
         self.log("info", "STARTING", device)
         start = datetime.now().replace(microsecond=0)
         results = {"runtime": app.get_time(), "logs": []}
@@ -448,7 +684,9 @@ class Run(AbstractBase):
                 targets_results = {}
                 for target in self.eval(self.service.iteration_values, **locals()):
                     self.payload_helper(payload, self.iteration_variable_name, target)
-                    targets_results[str(target)] = self.run_service_job(payload, device)
+                    targets_results[str(target)] = yield from self.run_service_job(
+                        payload, device
+                    )
                 results.update(
                     {
                         "result": targets_results,
@@ -456,7 +694,7 @@ class Run(AbstractBase):
                     }
                 )
             else:
-                results.update(self.run_service_job(payload, device))
+                results.update((yield from self.run_service_job(payload, device)))
         except Exception:
             results.update(
                 {"success": False, "result": chr(10).join(format_exc().splitlines())}
@@ -464,11 +702,8 @@ class Run(AbstractBase):
             self.log("error", chr(10).join(format_exc().splitlines()), device)
         results["duration"] = str(datetime.now().replace(microsecond=0) - start)
         if device:
-            status = "success" if results["success"] else "failure"
-            self.run_state["progress"]["device"][status] += 1
-            self.run_state["summary"][status].append(device.name)
+            self.update_progress(results, device.name)
             self.create_result(results, device)
-        Session.commit()
         self.log("info", "FINISHED", device)
         return results
 
@@ -477,7 +712,7 @@ class Run(AbstractBase):
         if device:
             log += f" - DEVICE {device.name}"
         log += f" : {content}"
-        app.run_logs[self.parent_runtime].append(log)
+        app.run_logs.append(self.parent_runtime, log)
 
     def build_notification(self, results):
         notification = {
@@ -503,7 +738,7 @@ class Run(AbstractBase):
         file_content = deepcopy(notification)
         if self.include_device_results:
             file_content["Device Results"] = {}
-            for device in self.devices:
+            for device in self.get_devices():
                 device_result = fetch(
                     "result",
                     service_id=self.service_id,
@@ -597,21 +832,13 @@ class Run(AbstractBase):
         results["success"] = not success if self.negative_logic else success
         results.update({"match": match, "negative_logic": self.negative_logic})
 
-    def match_dictionary(self, result, match, first=True):
+    def match_dictionary(self, result, match):
         if self.validation_method == "dict_equal":
-            return result == self.dict_match
-        else:
-            match_copy = deepcopy(match) if first else match
-            if isinstance(result, dict):
-                for k, v in result.items():
-                    if k in match_copy and match_copy[k] == v:
-                        match_copy.pop(k)
-                    else:
-                        self.match_dictionary(v, match_copy, False)
-            elif isinstance(result, list):
-                for item in result:
-                    self.match_dictionary(item, match_copy, False)
-            return not match_copy
+            return result == match
+        matcher = self.dictionary_matcher
+        if matcher is None or matcher.match != match:
+            matcher = self.dictionary_matcher = DictionaryMatcher(match)
+        return matcher(result)
 
     def transfer_file(self, ssh_client, files):
         if self.protocol == "sftp":
@@ -650,59 +877,58 @@ class Run(AbstractBase):
         return self.payload_helper(payload, name, device=device, **kwargs)
 
     def get_result(self, service_name, device=None, workflow=None):
-        def filter_run(query, property):
-            query = query.filter(
-                models["run"].service.has(
-                    getattr(models["service"], property) == service_name
-                )
-            )
-            return query.all()
+        key = (service_name, device, workflow)
+        if key in self.result_cache:
+            return self.result_cache[key]
 
-        def recursive_search(run: "Run"):
-            if not run:
-                return None
-            query = Session.query(models["run"]).filter(
-                models["run"].parent_runtime == run.parent_runtime
+        def find_result(parent_runtime, property):
+            services = Session.query(models["service"].id).filter(
+                getattr(models["service"], property) == service_name
             )
-            if workflow or self.workflow:
-                name = workflow or self.workflow.name
-                query.filter(
-                    models["run"].workflow.has(models["workflow"].name == name)
+            filters = [models["result"].service_id.in_(services.subquery())]
+            if workflow:
+                filters.append(
+                    models["result"].workflow.has(models["workflow"].name == workflow)
                 )
-            runs = filter_run(query, "scoped_name") or filter_run(query, "name")
-            results = list(filter(None, [run.result(device) for run in runs]))
-            if not results:
-                return recursive_search(run.restart_run)
-            else:
-                return results.pop().result
+            return self.fetch_result(parent_runtime, *filters, device=device)
 
-        return recursive_search(self)
+        if app.result_writer.results:
+            app.result_writer.flush()
+        run, run_id, runtime = models["run"], self.id, self.parent_runtime
+        while True:
+            result = find_result(runtime, "scoped_name") or find_result(runtime, "name")
+            if result:
+                self.result_cache[key] = result.result
+                return result.result
+            restart_run = (
+                Session.query(run.id, run.parent_runtime)
+                .filter_by(restart_run_id=run_id)
+                .first()
+            )
+            if not restart_run:
+                return None
+            run_id, runtime = restart_run
 
     def python_code_kwargs(_self, **locals):  # noqa: N805
-        return {
-            "config": app.config,
-            "devices": _self.devices,
-            "get_var": partial(_self.get_var, locals.get("payload", {})),
-            "get_result": _self.get_result,
-            "log": _self.log,
-            "workflow": _self.workflow,
-            "set_var": partial(_self.payload_helper, locals.get("payload", {})),
-            "parent_device": _self.parent_device or locals.get("device"),
-            **locals,
-        }
+        return EvaluationNamespace(_self, locals)
 
     def eval(_self, query, function="eval", **locals):  # noqa: N805
-        return builtins[function](query, _self.python_code_kwargs(**locals))
+        code = compile_code(query, function)
+        return builtins[function](code, _self.python_code_kwargs(**locals))
 
     def sub(self, input, variables):
-        r = compile("{{(.*?)}}")
-
-        def replace(match):
-            return str(self.eval(match.group()[2:-2], **variables))
+        def render(input):
+            fragments = tokenize_template(input)
+            if len(fragments) == 1:
+                return input
+            return "".join(
+                str(self.eval(fragment, **variables)) if index % 2 else fragment
+                for index, fragment in enumerate(fragments)
+            )
 
         def rec(input):
             if isinstance(input, str):
-                return r.sub(replace, input)
+                return render(input)
             elif isinstance(input, list):
                 return [rec(x) for x in input]
             elif isinstance(input, dict):
@@ -738,9 +964,14 @@ class Run(AbstractBase):
         if connection:
             self.log("info", "Using cached Netmiko connection", device)
             return self.update_netmiko_connection(connection)
-        self.log("info", "Opening new Netmiko connection", device)
         username, password = self.get_credentials(device)
         driver = device.netmiko_driver if self.use_device_driver else self.driver
+        key = ("netmiko", device.id, driver, username, password)
+        connection = self.borrow_connection(key, device)
+        if connection:
+            self.log("info", "Using pooled Netmiko connection", device)
+            return self.update_netmiko_connection(connection)
+        self.log("info", "Opening new Netmiko connection", device)
         netmiko_connection = ConnectHandler(
             device_type=driver,
             ip=device.ip_address,
@@ -756,9 +987,7 @@ class Run(AbstractBase):
             netmiko_connection.enable()
         if self.config_mode:
             netmiko_connection.config_mode()
-        app.connections_cache["netmiko"][self.parent_runtime][
-            device.name
-        ] = netmiko_connection
+        self.cache_connection(key, device, netmiko_connection)
         return netmiko_connection
 
     def napalm_connection(self, device):
@@ -766,16 +995,20 @@ class Run(AbstractBase):
         if connection:
             self.log("info", "Using cached NAPALM connection", device)
             return connection
-        self.log("info", "Opening new NAPALM connection", device)
         username, password = self.get_credentials(device)
+        driver_name = device.napalm_driver if self.use_device_driver else self.driver
+        key = ("napalm", device.id, driver_name, username, password)
+        connection = self.borrow_connection(key, device)
+        if connection:
+            self.log("info", "Using pooled NAPALM connection", device)
+            return connection
+        self.log("info", "Opening new NAPALM connection", device)
         optional_args = self.service.optional_args
         if not optional_args:
             optional_args = {}
         if "secret" not in optional_args:
             optional_args["secret"] = device.enable_password
-        driver = get_network_driver(
-            device.napalm_driver if self.use_device_driver else self.driver
-        )
+        driver = get_network_driver(driver_name)
         napalm_connection = driver(
             hostname=device.ip_address,
             username=username,
@@ -784,43 +1017,62 @@ class Run(AbstractBase):
             optional_args=optional_args,
         )
         napalm_connection.open()
-        app.connections_cache["napalm"][self.parent_runtime][
-            device.name
-        ] = napalm_connection
+        self.cache_connection(key, device, napalm_connection)
         return napalm_connection
 
+    def cache_connection(self, key, device, connection):
+        app.connections_cache[key[0]][self.parent_runtime][device.name] = connection
+        app.connection_pool.register(key, connection)
+        app.connection_monitor.track(key[0], device.name, connection)
+
+    def borrow_connection(self, key, device):
+        if self.start_new_connection:
+            return
+        while True:
+            connection = app.connection_pool.acquire(key)
+            if not connection:
+                return
+            app.connections_cache[key[0]][self.parent_runtime][device.name] = connection
+            if self.is_connection_alive(key[0], connection):
+                return connection
+            self.disconnect(key[0], device, connection)
+
+    def is_connection_alive(self, library, connection):
+        return app.connection_monitor.is_alive(library, connection)
+
     def get_or_close_connection(self, library, device):
         connection = self.get_connection(library, device)
         if not connection:
             return
         if self.start_new_connection:
             return self.disconnect(library, device, connection)
-        if library == "napalm":
-            if connection.is_alive():
-                return connection
-            else:
-                self.disconnect(library, device, connection)
-        else:
-            try:
-                connection.find_prompt()
-                return connection
-            except Exception:
-                self.disconnect(library, device, connection)
+        if self.is_connection_alive(library, connection):
+            return connection
+        self.disconnect(library, device, connection)
 
     def get_connection(self, library, device):
         cache = app.connections_cache[library].get(self.parent_runtime, {})
         return cache.get(device.name)
 
-    def close_device_connection(self, device):
+    def close_device_connection(self, device, release=False):
         for library in ("netmiko", "napalm"):
             connection = self.get_connection(library, device)
             if connection:
-                self.disconnect(library, device, connection)
+                self.disconnect(library, device, connection, release)
 
-    def disconnect(self, library, device, connection):
+    def release_connections(self):
+        for library, cache in app.connections_cache.items():
+            for connection in cache.pop(self.parent_runtime, {}).values():
+                if not app.connection_pool.release(connection):
+                    app.connection_pool.close(library, connection)
+
+    def disconnect(self, library, device, connection, release=False):
+        app.connections_cache[library][self.parent_runtime].pop(device.name, None)
+        if release and app.connection_pool.release(connection):
+            return self.log("info", f"Released {library} connection to pool", device)
+        app.connection_pool.forget(connection)
         try:
             connection.disconnect() if library == "netmiko" else connection.close()
-            app.connections_cache[library][self.parent_runtime].pop(device.name)
             self.log("info", f"Closed {library} connection", device)
         except Exception as exc:
             self.log(
@@ -836,3 +1088,150 @@ class Run(AbstractBase):
         }
         with open(path / "data.yml", "w") as file:
             yaml.dump(data, file, default_flow_style=False)
+
+
+class DictionaryMatcher:
+    def __init__(self, match):
+        self.match = match
+        self.indexes = {key: index for index, key in enumerate(match)}
+        self.values = list(match.values())
+        self.complete = (1 << len(match)) - 1
+
+    def __call__(self, result):
+        return self.walk(result, 0) == self.complete
+
+    def walk(self, result, matched):
+        if matched == self.complete:
+            return matched
+        if isinstance(result, dict):
+            for key, value in result.items():
+                index = self.indexes.get(key)
+                if (
+                    index is not None
+                    and not matched >> index & 1
+                    and self.values[index] == value
+                ):
+                    matched |= 1 << index
+                else:
+                    matched = self.walk(value, matched)
+                if matched == self.complete:
+                    break
+        elif isinstance(result, list):
+            for item in result:
+                matched = self.walk(item, matched)
+                if matched == self.complete:
+                    break
+        return matched
+
+
+class EvaluationNamespace(dict):
+    lazy_variables = (
+        "config",
+        "devices",
+        "get_var",
+        "get_result",
+        "log",
+        "workflow",
+        "set_var",
+        "parent_device",
+    )
+
+    def __init__(self, run, locals):
+        super().__init__(locals)
+        self.run = run
+
+    def __missing__(self, key):
+        if key not in self.lazy_variables:
+            raise KeyError(key)
+        value = self[key] = getattr(self, key)()
+        return value
+
+    def config(self):
+        return app.config
+
+    def devices(self):
+        return (
+            Session.query(models["device"])
+            .filter(models["device"].runs.any(id=self.run.id))
+            .all()
+        )
+
+    def get_var(self):
+        return partial(self.run.get_var, self.get("payload", {}))
+
+    def get_result(self):
+        return self.run.get_result
+
+    def log(self):
+        return self.run.log
+
+    def workflow(self):
+        return self.run.workflow
+
+    def set_var(self):
+        return partial(self.run.payload_helper, self.get("payload", {}))
+
+    def parent_device(self):
+        return self.run.parent_device or self.get("device")
+
+
+template_fragment = compile("{{(.*?)}}")
+
+
+@lru_cache(maxsize=4096)
+def compile_code(source, mode):
+    return builtins["compile"](source, "<string>", mode)
+
+
+@lru_cache(maxsize=4096)
+def tokenize_template(template):
+    return tuple(template_fragment.split(template))
+
+
+def run_to_completion(job):
+    while True:
+        try:
+            sleep(next(job))
+        except StopIteration as stop:
+            return stop.value
+
+
+def session_bound(job, session):
+    try:
+        while True:
+            previous = Session.registry() if Session.registry.has() else None
+            Session.registry.set(session)
+            try:
+                delay = next(job)
+            finally:
+                if previous is None:
+                    Session.registry.clear()
+                else:
+                    Session.registry.set(previous)
+            yield delay
+    except StopIteration as stop:
+        return stop.value
+    finally:
+        session.close()
+
+
+def get_process_result(args):
+    device_id, runtime, payload = args
+    device = fetch("device", id=device_id)
+    run = fetch("run", runtime=runtime)
+    for connections in app.connections_cache.values():
+        connections.pop(run.parent_runtime, None)
+    if run.runtime != run.parent_runtime:
+        app.run_db[run.parent_runtime]["services"] = defaultdict(dict)
+    run.freeze_parameters()
+    run.init_state()
+    try:
+        results = run.get_results(payload, device)
+        run.close_device_connection(device, release=True)
+        app.result_writer.flush()
+    finally:
+        logs = app.run_logs.pop_pending(run.parent_runtime)
+        app.run_db.pop(run.parent_runtime, None)
+        app.run_state_store.unwatch(run.parent_runtime)
+        Session.remove()
+    return device.name, results, logs, payload.get("variables", {})
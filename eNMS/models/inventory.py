@@ -85,7 +85,7 @@ class Device(CustomDevice):
     icon = Column(SmallString, default="router")
     operating_system = Column(SmallString)
     os_version = Column(SmallString)
-    ip_address = Column(SmallString)
+    ip_address = Column(SmallString, index=True)
     longitude = Column(SmallString, default="0.0")
     latitude = Column(SmallString, default="0.0")
     port = Column(Integer, default=22)
@@ -125,51 +125,7 @@ class Device(CustomDevice):
         return f"{self.name} ({self.model})" if self.model else self.name
 
     def generate_row(self, **kwargs):
-        return super().generate_row() + [
-            f"""
-            <ul class="pagination pagination-lg" style="margin: 0px; width: 300px">
-          <li>
-            <button type="button" class="btn btn-info"
-            onclick="showDeviceNetworkData({self.row_properties})"
-            data-tooltip="Network Data"
-              ><span class="glyphicon glyphicon-cog"></span
-            ></button>
-          </li>
-          <li>
-            <button type="button" class="btn btn-info"
-            onclick="showDeviceResultsPanel({self.row_properties})"
-            data-tooltip="Results"
-              ><span class="glyphicon glyphicon-list-alt"></span
-            ></button>
-          </li>
-          <li>
-            <button type="button" class="btn btn-success"
-            onclick="showPanel('device_connection', '{self.id}')"
-            data-tooltip="Connection"
-              ><span class="glyphicon glyphicon-console"></span
-            ></button>
-          </li>
-          <li>
-            <button type="button" class="btn btn-primary"
-            onclick="showTypePanel('device', '{self.id}')" data-tooltip="Edit"
-              ><span class="glyphicon glyphicon-edit"></span
-            ></button>
-          </li>
-          <li>
-            <button type="button" class="btn btn-primary"
-            onclick="showTypePanel('device', '{self.id}', 'duplicate')"
-            data-tooltip="Duplicate"
-              ><span class="glyphicon glyphicon-duplicate"></span
-            ></button>
-          </li>
-          <li>
-            <button type="button" class="btn btn-danger"
-            onclick="showDeletionPanel({self.row_properties})" data-tooltip="Delete"
-              ><span class="glyphicon glyphicon-trash"></span
-            ></button>
-          </li>
-        </ul>"""
-        ]
+        return super().generate_row() + [self.row_properties]
 
     def __repr__(self):
         return f"{self.name} ({self.model})" if self.model else self.name
@@ -232,30 +188,7 @@ class Link(Object):
         super().update(**kwargs)
 
     def generate_row(self, **kwargs):
-        return super().generate_row() + [
-            f"""
-            <ul class="pagination pagination-lg" style="margin: 0px; width: 150px">
-          <li>
-            <button type="button" class="btn btn-primary"
-            onclick="showTypePanel('link', '{self.id}')" data-tooltip="Edit"
-              ><span class="glyphicon glyphicon-edit"></span
-            ></button>
-          </li>
-          <li>
-            <button type="button" class="btn btn-primary"
-            onclick="showTypePanel('link', '{self.id}', 'duplicate')"
-            data-tooltip="Duplicate"
-              ><span class="glyphicon glyphicon-duplicate"></span
-            ></button>
-          </li>
-          <li>
-            <button type="button" class="btn btn-danger"
-            onclick="showDeletionPanel({self.row_properties})" data-tooltip="Delete"
-              ><span class="glyphicon glyphicon-trash"></span
-            ></button>
-          </li>
-        </ul>"""
-        ]
+        return super().generate_row() + [self.row_properties]
 
 
 AbstractPool = type(
@@ -318,47 +251,7 @@ class Pool(AbstractPool):
         self.compute_pool()
 
     def generate_row(self, **kwargs):
-        return super().generate_row() + [
-            f"""
-            <ul class="pagination pagination-lg" style="margin: 0px; width: 300px">
-          <li>
-            <button type="button" class="btn btn-info"
-            onclick="showPoolView('{self.id}')" data-tooltip="Internal View"
-              ><span class="glyphicon glyphicon-eye-open"></span
-            ></button>
-          </li>
-          <li>
-            <button type="button" class="btn btn-primary"
-            onclick="showPoolObjectsPanel('{self.id}')" data-tooltip="Pool Objects"
-              ><span class="glyphicon glyphicon-wrench"></span
-            ></button>
-          </li>
-          <li>
-            <button type="button" class="btn btn-primary"
-            onclick="updatePools('{self.id}')" data-tooltip="Update"
-              ><span class="glyphicon glyphicon-refresh"></span
-            ></button>
-          </li>
-          <li>
-            <button type="button" class="btn btn-primary"
-            onclick="showTypePanel('pool', '{self.id}')" data-tooltip="Edit"
-              ><span class="glyphicon glyphicon-edit"></span
-            ></button>
-          </li>
-          <li>
-            <button type="button" class="btn btn-primary"
-            onclick="showTypePanel('pool', '{self.id}', 'duplicate')"
-            data-tooltip="Duplicate"
-              ><span class="glyphicon glyphicon-duplicate"></span
-            ></button>
-          </li>
-          <li>
-            <button type="button" class="btn btn-danger"
-            onclick="showDeletionPanel({self.row_properties})" data-tooltip="Delete"
-              ><span class="glyphicon glyphicon-trash"></span
-            ></button>
-          </li></ul>"""
-        ]
+        return super().generate_row() + [self.row_properties]
 
     @property
     def object_number(self):
@@ -60,43 +60,7 @@ class Task(AbstractBase):
 
     def generate_row(self, **kwargs):
         return super().generate_row() + [
-            f"""
-            <ul class="pagination pagination-lg" style="margin: 0px; width: 250px">
-          <li>
-            <button type="button" class="btn btn-success
-            {'disabled' if self.is_active else 'active'}"
-            {'disabled' if self.is_active else 'active'}
-            onclick="resumeTask('{self.id}')" data-tooltip="Play"
-              ><span class="glyphicon glyphicon-play"></span
-            ></button>
-          </li>
-          <li>
-            <button type="button" class="btn btn-default
-            {'active' if self.is_active else 'disabled'}"
-            {'active' if self.is_active else 'disabled'}
-            onclick="pauseTask('{self.id}')" data-tooltip="Pause"
-              ><span class="glyphicon glyphicon-pause"></span
-            ></button>
-          </li>
-          <li>
-            <button type="button" class="btn btn-primary"
-            onclick="showTypePanel('task', '{self.id}')" data-tooltip="Edit"
-              ><span class="glyphicon glyphicon-edit"></span
-            ></button>
-          </li>
-          <li>
-            <button type="button" class="btn btn-primary"
-            onclick="showTypePanel('task', '{self.id}', 'duplicate')"
-            data-tooltip="Duplicate">
-            <span class="glyphicon glyphicon-duplicate"></span></button>
-          </li>
-          <li>
-            <button type="button" class="btn btn-danger"
-            onclick="showDeletionPanel({self.row_properties})" data-tooltip="Delete"
-              ><span class="glyphicon glyphicon-trash"></span
-            ></button>
-          </li>
-        </ul>"""
+            {**self.row_properties, "is_active": self.is_active}
         ]
 
     @hybrid_property
@@ -155,7 +119,7 @@ class Task(AbstractBase):
     def kwargs(self):
         default = {
             "id": self.aps_job_id,
-            "func": app.run,
+            "func": "eNMS:app.dispatch_run",
             "replace_existing": True,
             "args": [self.service.id],
             "kwargs": self.run_properties(),
@@ -233,29 +197,7 @@ class Event(AbstractBase):
     service_name = association_proxy("service", "name")
 
     def generate_row(self, **kwargs):
-        return super().generate_row() + [
-            f"""
-            <ul class="pagination pagination-lg" style="margin: 0px; width: 150px">
-          <li>
-            <button type="button" class="btn btn-primary"
-            onclick="showTypePanel('event', '{self.id}')" data-tooltip="Edit"
-              ><span class="glyphicon glyphicon-edit"></span
-            ></button>
-          </li>
-          <li>
-            <button type="button" class="btn btn-primary"
-            onclick="showTypePanel('event', '{self.id}', 'duplicate')"
-            data-tooltip="Duplicate">
-            <span class="glyphicon glyphicon-duplicate"></span></button>
-          </li>
-          <li>
-            <button type="button" class="btn btn-danger"
-            onclick="showDeletionPanel({self.row_properties})" data-tooltip="Delete"
-              ><span class="glyphicon glyphicon-trash"></span
-            ></button>
-          </li>
-        </ul>"""
-        ]
+        return super().generate_row() + [self.row_properties]
 
     def match_log(self, source, content):
         source_match = (
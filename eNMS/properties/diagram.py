@@ -18,6 +18,7 @@ service_diagram_properties = [
     "send_notification_method",
     "multiprocessing",
     "max_processes",
+    "multiprocessing_mode",
     "number_of_retries",
     "time_between_retries",
 ]
@@ -1,5 +1,12 @@
+from asyncio import (
+    create_subprocess_exec,
+    gather,
+    open_connection,
+    TimeoutError,
+    wait_for,
+)
 from socket import error, gaierror, socket, timeout
-from subprocess import check_output
+from subprocess import CalledProcessError, check_output, PIPE
 from sqlalchemy import ForeignKey, Integer
 from wtforms import HiddenField, IntegerField, SelectField, StringField
 
@@ -22,36 +29,43 @@ class PingService(Service):
 
     __mapper_args__ = {"polymorphic_identity": "ping_service"}
 
+    def get_icmp_command(self, device):
+        command = ["ping"]
+        for x, property in (
+            ("c", "count"),
+            ("W", "timeout"),
+            ("t", "ttl"),
+            ("s", "packet_size"),
+        ):
+            value = getattr(self, property)
+            if value:
+                command.extend(f"-{x} {value}".split())
+        command.append(device.ip_address)
+        return command
+
+    def get_icmp_results(self, run, output):
+        output = output.decode().strip().splitlines()
+        total = output[-2].split(",")[3].split()[1]
+        loss = output[-2].split(",")[2].split()[0]
+        timing = output[-1].split()[3].split("/")
+        return {
+            "success": True,
+            "result": {
+                "probes_sent": run.count,
+                "packet_loss": loss,
+                "rtt_min": timing[0],
+                "rtt_max": timing[2],
+                "rtt_avg": timing[1],
+                "rtt_stddev": timing[3],
+                "total rtt": total,
+            },
+        }
+
     def job(self, run, payload, device):
         if run.protocol == "ICMP":
-            command = ["ping"]
-            for x, property in (
-                ("c", "count"),
-                ("W", "timeout"),
-                ("t", "ttl"),
-                ("s", "packet_size"),
-            ):
-                value = getattr(self, property)
-                if value:
-                    command.extend(f"-{x} {value}".split())
-            command.append(device.ip_address)
+            command = self.get_icmp_command(device)
             run.log("info", f"Running PING ({command})", device)
-            output = check_output(command).decode().strip().splitlines()
-            total = output[-2].split(",")[3].split()[1]
-            loss = output[-2].split(",")[2].split()[0]
-            timing = output[-1].split()[3].split("/")
-            return {
-                "success": True,
-                "result": {
-                    "probes_sent": run.count,
-                    "packet_loss": loss,
-                    "rtt_min": timing[0],
-                    "rtt_max": timing[2],
-                    "rtt_avg": timing[1],
-                    "rtt_stddev": timing[3],
-                    "total rtt": total,
-                },
-            }
+            return self.get_icmp_results(run, check_output(command))
         else:
             result = {}
             for port in map(int, run.ports.split(",")):
@@ -66,6 +80,33 @@ class PingService(Service):
                 result[port] = connection
             return {"success": all(result.values()), "result": result}
 
+    async def async_job(self, run, payload, device):
+        if run.protocol == "ICMP":
+            command = self.get_icmp_command(device)
+            run.log("info", f"Running PING ({command})", device)
+            process = await create_subprocess_exec(*command, stdout=PIPE)
+            output, _ = await process.communicate()
+            if process.returncode:
+                raise CalledProcessError(process.returncode, command, output)
+            return self.get_icmp_results(run, output)
+        else:
+            ports = list(map(int, run.ports.split(",")))
+            connections = await gather(
+                *(self.tcp_connect(run, device, port) for port in ports)
+            )
+            result = dict(zip(ports, connections))
+            return {"success": all(result.values()), "result": result}
+
+    async def tcp_connect(self, run, device, port):
+        try:
+            _, writer = await wait_for(
+                open_connection(device.ip_address, port), run.timeout
+            )
+        except (OSError, TimeoutError):
+            return False
+        writer.close()
+        return True
+
 
 class PingForm(ServiceForm):
     form_type = HiddenField(default="ping_service")
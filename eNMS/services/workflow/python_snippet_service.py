@@ -33,12 +33,10 @@ class PythonSnippetService(Service):
             if kwargs.get("exit"):
                 raise SystemExit()
 
-        globals = {
-            "__builtins__": __builtins__,
-            "results": results,
-            "save_result": save_result,
-            **run.python_code_kwargs(**locals()),
-        }
+        globals = run.python_code_kwargs(**locals())
+        globals.update(
+            __builtins__=__builtins__, results=results, save_result=save_result
+        )
 
         try:
             exec(code_object, globals)
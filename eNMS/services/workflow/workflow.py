@@ -1,16 +1,22 @@
 from collections import defaultdict
+from heapq import heappop, heappush
+from itertools import count
+from math import ceil
 from sqlalchemy import Boolean, ForeignKey, Integer
 from sqlalchemy.orm import backref, relationship
-from time import sleep
-from wtforms import BooleanField, HiddenField, SelectField
+from time import time
+from wtforms import BooleanField, HiddenField, IntegerField, SelectField
 
+from eNMS import app
 from eNMS.database import Session
 from eNMS.database.base import AbstractBase
 from eNMS.database.dialect import Column, MutableDict, SmallString
-from eNMS.database.functions import delete, factory, fetch
+from eNMS.database.functions import delete, factory, fetch, fetch_in
 from eNMS.database.associations import service_workflow_table
 from eNMS.forms.automation import ServiceForm
+from eNMS.models import models
 from eNMS.models.automation import Service
+from eNMS.models.execution import session_bound
 
 
 class Workflow(Service):
@@ -20,6 +26,7 @@ class Workflow(Service):
     parent_type = "service"
     id = Column(Integer, ForeignKey("service.id"), primary_key=True)
     close_connection = Column(Boolean, default=False)
+    max_parallel_services = Column(Integer, default=1)
     labels = Column(MutableDict)
     services = relationship(
         "Service", secondary=service_workflow_table, back_populates="workflows"
@@ -106,76 +113,219 @@ class Workflow(Service):
         else:
             return self.standard_bfs(run, *args)
 
-    def tracking_bfs(self, run, payload):
-        number_of_runs = defaultdict(int)
-        start = fetch("service", scoped_name="Start")
-        end = fetch("service", scoped_name="End")
-        services = [fetch("service", id=id) for id in run.start_services]
-        visited, success, targets = set(), False, defaultdict(set)
+    @staticmethod
+    def get_service_results(args):
+        job = Workflow.delayed_service_results(*args)
+        return session_bound(job, Session.session_factory())
+
+    @staticmethod
+    def delayed_service_results(run_id, payload):
+        return (yield from fetch("run", id=run_id).delayed_run(payload))
+
+    def get_topology(self):
+        topology = app.workflow_graphs.get(self.id)
+        if topology and topology["last_modified"] == self.last_modified:
+            return topology
+        topology = {
+            "last_modified": self.last_modified,
+            "start": fetch("service", scoped_name="Start").id,
+            "end": fetch("service", scoped_name="End").id,
+            "source": {},
+            "destination": {},
+        }
+        edges = (
+            Session.query(
+                WorkflowEdge.id,
+                WorkflowEdge.source_id,
+                WorkflowEdge.destination_id,
+                WorkflowEdge.subtype,
+            )
+            .filter_by(workflow_id=self.id)
+            .order_by(WorkflowEdge.id)
+        )
+        for edge_id, source_id, destination_id, subtype in edges:
+            topology["destination"].setdefault(source_id, {}).setdefault(
+                subtype, []
+            ).append((destination_id, edge_id))
+            topology["source"].setdefault(destination_id, {}).setdefault(
+                subtype, []
+            ).append((source_id, edge_id))
+        app.workflow_graphs[self.id] = topology
+        return topology
+
+    def get_graph(self, run):
+        topology = self.get_topology()
+        service_ids = {
+            topology["start"],
+            topology["end"],
+            *run.start_services,
+            *topology["source"],
+            *topology["destination"],
+        }
+        services = Session.query(models["service"]).filter(
+            models["service"].id.in_(service_ids)
+        )
+        return topology, {service.id: service for service in services}
+
+    def get_adjacent_services(self, graph, service, direction, subtype):
+        topology, services = graph
+        for service_id, edge_id in (
+            topology[direction].get(service.id, {}).get(subtype, [])
+        ):
+            yield services[service_id], edge_id
+
+    def traverse(self, run, payload, device, graph, get_devices, process_results):
+        number_of_runs, visited, running, waiting = defaultdict(int), set(), {}, []
+        parked, counter = [], count()
+        topology, services_by_id = graph
+        start, end = services_by_id[topology["start"]], services_by_id[topology["end"]]
+        services = [services_by_id[id] for id in run.start_services]
         restart_run = run.restart_run
-        for service in services:
-            targets[service.name] |= {device.name for device in run.devices}
-        while services:
-            if run.stop:
-                return {"payload": payload, "success": False}
-            service = services.pop()
-            if number_of_runs[service.name] >= service.maximum_runs or any(
-                node not in visited
-                for node, _ in service.adjacent_services(self, "source", "prerequisite")
-            ):
-                continue
-            number_of_runs[service.name] += 1
-            visited.add(service)
-            skip_service = False
-            if service.skip_query:
-                skip_service = run.eval(service.skip_query, **locals())
-            if skip_service or service.skip or service in (start, end):
-                results = {
-                    "success": "skipped",
-                    "summary": {
-                        "success": {device.name for device in run.devices},
-                        "failure": [],
-                    },
-                }
+        if self.max_parallel_services > 1:
+            batch = app.worker_pool.open_batch(
+                f"{run.runtime} ({self.name})",
+                self.get_service_results,
+                self.max_parallel_services,
+            )
+        try:
+            while services or running or parked:
+                if run.stop:
+                    for run_id, _ in batch.cancel() if running else ():
+                        running.pop(run_id)
+                        fetch("run", id=run_id).status = "Aborted"
+                    while running and batch.next_completed():
+                        pass
+                    return None
+                while parked and parked[0][0] <= time():
+                    services.extend(heappop(parked)[-1])
+                if not services and not running and not parked:
+                    continue
+                for due, _, state, _ in parked:
+                    state["waiting_time"]["left"] = max(ceil(due - time()), 0)
+                timeout = max(min(parked[0][0] - time(), 1), 0) if parked else None
+                busy = len(running) + len(parked) >= self.max_parallel_services
+                if running and (busy or not services):
+                    completed = batch.next_completed(timeout)
+                    if not completed:
+                        continue
+                    (run_id, _), results = completed
+                    service = running.pop(run_id)
+                    services.extend(waiting)
+                    waiting.clear()
+                elif busy or not services:
+                    yield timeout
+                    continue
+                else:
+                    service = services.pop()
+                    prerequisites = [
+                        node
+                        for node, _ in self.get_adjacent_services(
+                            graph, service, "source", "prerequisite"
+                        )
+                    ]
+                    if any(node in running.values() for node in prerequisites):
+                        waiting.append(service)
+                        continue
+                    if number_of_runs[service.name] >= service.maximum_runs or any(
+                        node not in visited for node in prerequisites
+                    ):
+                        continue
+                    number_of_runs[service.name] += 1
+                    skip_service = False
+                    if service.skip_query:
+                        skip_service = run.eval(service.skip_query, **locals())
+                    if skip_service or service.skip or service in (start, end):
+                        results = {
+                            "success": "skipped",
+                            "summary": {
+                                "success": {device.name for device in run.devices},
+                                "failure": [],
+                            },
+                        }
+                    else:
+                        kwargs = {
+                            "service": service.id,
+                            "workflow": self.id,
+                            "restart_run": restart_run,
+                            "parent": run,
+                            "parent_runtime": run.parent_runtime,
+                        }
+                        if run.parent_device_id:
+                            kwargs["parent_device"] = run.parent_device_id
+                        devices = get_devices(service)
+                        if devices is not None:
+                            kwargs["devices"] = devices
+                        service_run = factory("run", **kwargs)
+                        if self.max_parallel_services == 1:
+                            results = yield from service_run.delayed_run(payload)
+                        else:
+                            Session.commit()
+                            running[service_run.id] = service
+                            batch.submit((service_run.id, payload))
+                            continue
+                visited.add(service)
+                successors = process_results(service, results)
+                if results["success"] == "skipped" or not service.waiting_time:
+                    services.extend(successors)
+                else:
+                    due = time() + service.waiting_time
+                    state = app.run_db[run.parent_runtime]["services"].setdefault(
+                        f"{run.path}>{service.id}", {}
+                    )
+                    state["waiting_time"] = {
+                        "total": service.waiting_time,
+                        "left": service.waiting_time,
+                    }
+                    heappush(parked, (due, next(counter), state, successors))
+        finally:
+            if self.max_parallel_services > 1:
+                app.worker_pool.close_batch(batch)
+        return visited
+
+    def tracking_bfs(self, run, payload):
+        graph = self.get_graph(run)
+        topology, services = graph
+        start, end = services[topology["start"]], services[topology["end"]]
+        targets = defaultdict(set)
+        for id in run.start_services:
+            targets[services[id].name] |= {device.name for device in run.devices}
+
+        def get_devices(service):
+            devices, _ = fetch_in("device", "name", targets[service.name])
+            return [device.id for device in devices]
+
+        def process_results(service, results):
+            successors = []
+            if results["success"] == "skipped":
                 run.run_state["progress"]["service"]["skipped"] += len(
                     targets[service.name]
                 )
-            else:
-                kwargs = {
-                    "devices": [
-                        fetch("device", name=name).id for name in targets[service.name]
-                    ],
-                    "service": service.id,
-                    "workflow": self.id,
-                    "restart_run": restart_run,
-                    "parent": run,
-                    "parent_runtime": run.parent_runtime,
-                }
-                if run.parent_device_id:
-                    kwargs["parent_device"] = run.parent_device_id
-                service_run = factory("run", **kwargs)
-                results = service_run.run(payload)
             if service.run_method in ("once", "per_service_with_service_targets"):
                 edge_type = "success" if results["success"] else "failure"
-                for successor, edge in service.adjacent_services(
-                    self, "destination", edge_type
+                for successor, edge_id in self.get_adjacent_services(
+                    graph, service, "destination", edge_type
                 ):
                     targets[successor.name] |= targets[service.name]
-                    services.append(successor)
-                    run.edge_state[edge.id] += len(targets[service.name])
+                    successors.append(successor)
+                    run.edge_state[edge_id] += len(targets[service.name])
             else:
                 summary = results.get("summary")
                 for edge_type in ("success", "failure"):
-                    for successor, edge in service.adjacent_services(
-                        self, "destination", edge_type,
+                    for successor, edge_id in self.get_adjacent_services(
+                        graph, service, "destination", edge_type,
                     ):
                         if not summary[edge_type]:
                             continue
                         targets[successor.name] |= set(summary[edge_type])
-                        services.append(successor)
-                        run.edge_state[edge.id] += len(summary[edge_type])
-            if not results["success"] == "skipped":
-                sleep(service.waiting_time)
+                        successors.append(successor)
+                        run.edge_state[edge_id] += len(summary[edge_type])
+            return successors
+
+        visited = yield from self.traverse(
+            run, payload, None, graph, get_devices, process_results
+        )
+        if visited is None:
+            return {"payload": payload, "success": False}
         success_devices = targets[end.name]
         failure_devices = targets[start.name] - success_devices
         success = not failure_devices
@@ -190,69 +340,47 @@ class Workflow(Service):
         return {"payload": payload, "success": success}
 
     def standard_bfs(self, run, payload, device=None):
-        number_of_runs = defaultdict(int)
-        start = fetch("service", scoped_name="Start")
-        end = fetch("service", scoped_name="End")
-        services = [fetch("service", id=id) for id in run.start_services]
-        visited, success = set(), False
-        restart_run = run.restart_run
-        while services:
-            if run.stop:
-                return {"payload": payload, "success": False}
-            service = services.pop()
-            if number_of_runs[service.name] >= service.maximum_runs or any(
-                node not in visited
-                for node, _ in service.adjacent_services(self, "source", "prerequisite")
-            ):
-                continue
-            number_of_runs[service.name] += 1
-            visited.add(service)
-            skip_service = False
-            if service.skip_query:
-                skip_service = run.eval(service.skip_query, **locals())
-            if skip_service or service.skip or service in (start, end):
-                results = {
-                    "success": "skipped",
-                    "summary": {
-                        "success": {device.name for device in run.devices},
-                        "failure": [],
-                    },
-                }
+        graph = self.get_graph(run)
+        topology, services = graph
+
+        def get_devices(service):
+            return [device.id] if device else None
+
+        def process_results(service, results):
+            successors = []
+            if results["success"] == "skipped":
                 run.run_state["progress"]["service"]["skipped"] += 1
-            else:
-                kwargs = {
-                    "service": service.id,
-                    "workflow": self.id,
-                    "restart_run": restart_run,
-                    "parent": run,
-                    "parent_runtime": run.parent_runtime,
-                }
-                if run.parent_device_id:
-                    kwargs["parent_device"] = run.parent_device_id
-                if device:
-                    kwargs["devices"] = [device.id]
-                service_run = factory("run", **kwargs)
-                results = service_run.run(payload)
-                if not device:
-                    status = "success" if results["success"] else "failure"
-                    run.run_state["progress"]["service"][status] += 1
-            for successor, edge in service.adjacent_services(
-                self, "destination", "success" if results["success"] else "failure",
+            elif not device:
+                status = "success" if results["success"] else "failure"
+                run.run_state["progress"]["service"][status] += 1
+            for successor, edge_id in self.get_adjacent_services(
+                graph,
+                service,
+                "destination",
+                "success" if results["success"] else "failure",
             ):
-                services.append(successor)
+                successors.append(successor)
                 if device:
-                    run.edge_state[edge.id] += 1
+                    run.edge_state[edge_id] += 1
                 else:
-                    run.edge_state[edge.id] = "DONE"
-            if not results["success"] == "skipped":
-                sleep(service.waiting_time)
+                    run.edge_state[edge_id] = "DONE"
+            return successors
+
+        visited = yield from self.traverse(
+            run, payload, device, graph, get_devices, process_results
+        )
+        if visited is None:
+            return {"payload": payload, "success": False}
         Session.refresh(run)
-        return {"payload": payload, "success": end in visited}
+        return {"payload": payload, "success": services[topology["end"]] in visited}
 
 
 class WorkflowForm(ServiceForm):
     form_type = HiddenField(default="workflow")
     close_connection = BooleanField(default=False)
+    max_parallel_services = IntegerField(
+        "Maximum number of services running in parallel", default=1
+    )
     run_method = SelectField(
         "Run Method",
         choices=(
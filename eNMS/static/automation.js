@@ -204,6 +204,7 @@ function displayLogs(service, runtime, change) {
     editor.setSize("100%", "100%");
   }
   $(`#runtimes-${service.id}`).on("change", function() {
+    editor.setValue("");
     refreshLogs(service, this.value, editor);
   });
   refreshLogs(service, runtime, editor, true);
@@ -266,14 +267,33 @@ function displayResultsTable(service, runtime) {
 }
 
 // eslint-disable-next-line
-function refreshLogs(service, runtime, editor, first, wasRefreshed) {
+function refreshLogs(
+  service,
+  runtime,
+  editor,
+  first,
+  wasRefreshed,
+  offset = 0
+) {
   if (!$(`#runtime-${service.id}`).length) return;
-  call(`/get_service_logs/${service.id}/${runtime}`, function(result) {
-    editor.setValue(result.logs);
+  const url = `/get_service_logs/${service.id}/${runtime}/${offset}`;
+  call(url, function(result) {
+    if (result.logs) {
+      const end = { line: editor.lastLine() };
+      editor.replaceRange(`${offset ? "\n" : ""}${result.logs}`, end);
+    }
     editor.setCursor(editor.lineCount(), 0);
     if (first || result.refresh) {
       setTimeout(
-        () => refreshLogs(service, runtime, editor, false, result.refresh),
+        () =>
+          refreshLogs(
+            service,
+            runtime,
+            editor,
+            false,
+            result.refresh,
+            result.offset
+          ),
         1000
       );
     } else if (wasRefreshed) {
@@ -23,6 +23,7 @@ workflow: true
 const currentUrl = window.location.href.split("#")[0].split("?")[0];
 let editors = {};
 let tables = {};
+let tableCursors = {};
 let userIsActive = true;
 let topZ = 1000;
 
@@ -592,8 +593,16 @@ function initTable(type, instance, runtime) {
         if (runtime) {
           d.runtime = $(`#runtimes-${instance.id}`).val() || runtime;
         }
+        setTableCursor(type, d);
         return JSON.stringify(d);
       },
+      dataSrc: (result) => {
+        const pagination = tableCursors[type];
+        const nextPage = pagination.requests[result.draw];
+        delete pagination.requests[result.draw];
+        if (result.cursor) pagination.cursors[nextPage] = result.cursor;
+        return result.data.map((row) => renderTableRow(type, row));
+      },
     },
   });
   createSearchHeaders(type);
@@ -610,6 +619,198 @@ function initTable(type, instance, runtime) {
   }
 }
 
+function serializeRow(properties) {
+  return JSON.stringify(properties)
+    .replace(/&/g, "&amp;")
+    .replace(/"/g, "&quot;");
+}
+
+function tableButton(style, onclick, icon, tooltip, disabled) {
+  const state = disabled === undefined ? "" : disabled ? "disabled" : "active";
+  return `<li><button type="button" class="btn btn-${style} ${state}" ${state}
+    onclick="${onclick}" data-tooltip="${tooltip}"
+    ><span class="glyphicon glyphicon-${icon}"></span></button></li>`;
+}
+
+function tableToolbar(width, buttons) {
+  const style = width ? `margin: 0px; width: ${width}px` : "margin: 0px;";
+  return `<ul class="pagination pagination-lg" style="${style}">
+    ${buttons.join("")}</ul>`;
+}
+
+function instanceButtons(instance) {
+  return [
+    tableButton(
+      "primary",
+      `showTypePanel('${instance.type}', '${instance.id}')`,
+      "edit",
+      "Edit"
+    ),
+    tableButton(
+      "primary",
+      `showTypePanel('${instance.type}', '${instance.id}', 'duplicate')`,
+      "duplicate",
+      "Duplicate"
+    ),
+    tableButton(
+      "danger",
+      `showDeletionPanel(${serializeRow(instance)})`,
+      "trash",
+      "Delete"
+    ),
+  ];
+}
+
+function runtimeButtons(service, runtime) {
+  const runtimeArgument = runtime ? `, '${runtime}'` : "";
+  const serviceArgument = serializeRow(service);
+  return ["results", "logs"].map((panel) =>
+    tableButton(
+      "info",
+      `showRuntimePanel('${panel}', ${serviceArgument}${runtimeArgument})`,
+      panel == "results" ? "list-alt" : "list",
+      panel == "results" ? "Results" : "Logs"
+    )
+  );
+}
+
+const tableActions = {
+  device: (row, device) => [
+    tableToolbar(300, [
+      tableButton(
+        "info",
+        `showDeviceNetworkData(${serializeRow(device)})`,
+        "cog",
+        "Network Data"
+      ),
+      tableButton(
+        "info",
+        `showDeviceResultsPanel(${serializeRow(device)})`,
+        "list-alt",
+        "Results"
+      ),
+      tableButton(
+        "success",
+        `showPanel('device_connection', '${device.id}')`,
+        "console",
+        "Connection"
+      ),
+      ...instanceButtons(device),
+    ]),
+  ],
+  event: (row, event) => [tableToolbar(150, instanceButtons(event))],
+  link: (row, link) => [tableToolbar(150, instanceButtons(link))],
+  pool: (row, pool) => [
+    tableToolbar(300, [
+      tableButton(
+        "info",
+        `showPoolView('${pool.id}')`,
+        "eye-open",
+        "Internal View"
+      ),
+      tableButton(
+        "primary",
+        `showPoolObjectsPanel('${pool.id}')`,
+        "wrench",
+        "Pool Objects"
+      ),
+      tableButton("primary", `updatePools('${pool.id}')`, "refresh", "Update"),
+      ...instanceButtons(pool),
+    ]),
+  ],
+  result: (row, result) => {
+    const index = tableProperties.result.indexOf("success");
+    const [style, label] = row[index]
+      ? ["success", "Success"]
+      : ["danger", "Failure"];
+    row[index] = `<button type="button" class="btn btn-${style} btn-sm"
+      style="width:100%">${label}</button>`;
+    return [
+      `<button type="button" class="btn btn-info btn-sm"
+        onclick="showResult('${result.id}')">Results</button>`,
+      `<input type="radio" name="v1" value="${result.id}"/>`,
+      `<input type="radio" name="v2" value="${result.id}"/>`,
+    ];
+  },
+  run: (row, run) => [
+    tableToolbar(100, runtimeButtons(run.service, run.runtime)),
+  ],
+  server: (row, server) => [
+    `<center>${tableToolbar(null, instanceButtons(server))}</center>`,
+  ],
+  service: (row, service) => {
+    if (service.type == "workflow") {
+      row[0] = `<b><a href="#" onclick="switchToWorkflow('${service.id}')"
+        >${row[0]}</a></b>`;
+    }
+    return [
+      tableToolbar(350, [
+        ...runtimeButtons(service),
+        tableButton("success", `normalRun('${service.id}')`, "play", "Run"),
+        tableButton(
+          "success",
+          `showTypePanel('${service.type}', '${service.id}', 'run')`,
+          "play-circle",
+          "Parameterized Run"
+        ),
+        instanceButtons(service)[0],
+        tableButton(
+          "primary",
+          `exportService('${service.id}')`,
+          "download",
+          "Export"
+        ),
+        instanceButtons(service)[2],
+      ]),
+    ];
+  },
+  task: (row, task) => [
+    tableToolbar(250, [
+      tableButton(
+        "success",
+        `resumeTask('${task.id}')`,
+        "play",
+        "Play",
+        task.is_active
+      ),
+      tableButton(
+        "default",
+        `pauseTask('${task.id}')`,
+        "pause",
+        "Pause",
+        !task.is_active
+      ),
+      ...instanceButtons(task),
+    ]),
+  ],
+  user: (row, user) => [
+    `<center>${tableToolbar(null, instanceButtons(user))}</center>`,
+  ],
+};
+
+function renderTableRow(type, row) {
+  if (!tableActions[type]) return row;
+  const properties = row.pop();
+  return row.concat(tableActions[type](row, properties));
+}
+
+function setTableCursor(type, data) {
+  const signature = JSON.stringify([
+    data.form,
+    data.order,
+    data.length,
+    data.runtime,
+  ]);
+  if (!tableCursors[type] || tableCursors[type].signature != signature) {
+    tableCursors[type] = { signature: signature, cursors: {}, requests: {} };
+  }
+  const pagination = tableCursors[type];
+  pagination.requests[data.draw] = data.start + data.length;
+  if (data.start in pagination.cursors) {
+    data.cursor = pagination.cursors[data.start];
+  }
+}
+
 // eslint-disable-next-line
 function filter(formType) {
   tables[formType].ajax.reload(null, false);
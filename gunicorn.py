@@ -1,5 +1,7 @@
+from os import environ
+
 bind = "0.0.0.0:5000"
-workers = 1
+workers = int(environ.get("GUNICORN_WORKERS", 1))
 accesslog = "-"
 loglevel = "debug"
 capture_output = True
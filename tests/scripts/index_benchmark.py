@@ -0,0 +1,138 @@
+from pathlib import Path
+from random import choice, randrange
+from sqlalchemy import create_engine
+from sqlite3 import connect
+from sys import stdout
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from eNMS import app
+from eNMS.database import Base, create_indexes
+
+# Query plans and timings of the hot run / result / device queries, on a
+# generated database with 100k results, before and after the index pack
+# declared in the models is created with create_indexes.
+
+QUERIES = {
+    "fetch run by runtime": ("SELECT * FROM run WHERE runtime = ?", ("runtime-500",)),
+    "runs of a service in a runtime": (
+        "SELECT * FROM run WHERE parent_runtime = ? AND service_id = ?",
+        ("runtime-500", 3),
+    ),
+    "running runs of a service": (
+        "SELECT * FROM run WHERE service_id = ? AND status = ?",
+        (3, "Running"),
+    ),
+    "get_result lookup": (
+        "SELECT result FROM result WHERE parent_runtime = ? AND service_id = ? "
+        "AND device_id = ? ORDER BY id DESC LIMIT 1",
+        ("runtime-500", 3, 42),
+    ),
+    "result of a run for a device": (
+        "SELECT result FROM result WHERE run_id = ? AND device_id = ?",
+        (2500, 42),
+    ),
+    "REST result lookup": (
+        "SELECT result FROM result WHERE service_id = ? AND runtime = ?",
+        (3, "runtime-500"),
+    ),
+    "syslog device lookup": (
+        "SELECT * FROM device WHERE ip_address = ?",
+        ("10.0.3.232",),
+    ),
+    "run targets": (
+        "SELECT device_id FROM run_device_association WHERE run_id = ? UNION "
+        "SELECT device_id FROM pool_device_association WHERE pool_id = ?",
+        (2500, 7),
+    ),
+}
+
+
+def create_schema(engine):
+    Base.metadata.create_all(bind=engine)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.drop(bind=engine)
+
+
+def populate(connection, devices=1000, runs=5000, results=100_000):
+    device_ids = range(1, devices + 1)
+    connection.executemany(
+        "INSERT INTO object (id, name, type) VALUES (?, ?, 'device')",
+        ((id, f"device{id}") for id in device_ids),
+    )
+    connection.executemany(
+        "INSERT INTO custom_device (id) VALUES (?)", ((id,) for id in device_ids)
+    )
+    connection.executemany(
+        "INSERT INTO device (id, ip_address) VALUES (?, ?)",
+        ((id, f"10.0.{id // 256}.{id % 256}") for id in device_ids),
+    )
+    connection.executemany(
+        "INSERT INTO run (id, runtime, parent_runtime, service_id, status) "
+        "VALUES (?, ?, ?, ?, ?)",
+        (
+            (
+                id,
+                f"runtime-{id}",
+                f"runtime-{id // 5}",
+                randrange(1, 50),
+                choice(("Running", "Completed", "Aborted")),
+            )
+            for id in range(1, runs + 1)
+        ),
+    )
+    connection.executemany(
+        "INSERT INTO result (id, runtime, parent_runtime, run_id, service_id, "
+        "device_id, result) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (
+            (
+                id,
+                f"runtime-{id // 20}",
+                f"runtime-{id // 100}",
+                id // 20,
+                randrange(1, 50),
+                randrange(1, devices + 1),
+                b"x" * 200,
+            )
+            for id in range(1, results + 1)
+        ),
+    )
+    connection.executemany(
+        "INSERT INTO run_device_association (device_id, run_id) VALUES (?, ?)",
+        ((randrange(1, devices + 1), randrange(1, runs + 1)) for _ in range(results)),
+    )
+    connection.executemany(
+        "INSERT INTO pool_device_association (pool_id, device_id) VALUES (?, ?)",
+        ((randrange(1, 50), randrange(1, devices + 1)) for _ in range(20_000)),
+    )
+    connection.commit()
+
+
+def measure(connection, title, repeat=200):
+    stdout.write(f"\n{title}\n{'=' * len(title)}\n")
+    for name, (query, parameters) in QUERIES.items():
+        plan = connection.execute(f"EXPLAIN QUERY PLAN {query}", parameters)
+        start = perf_counter()
+        for _ in range(repeat):
+            connection.execute(query, parameters).fetchall()
+        duration = (perf_counter() - start) / repeat * 1000
+        stdout.write(f"{name}: {duration:.3f} ms\n")
+        for row in plan:
+            stdout.write(f"    {row[-1]}\n")
+
+
+if __name__ == "__main__":
+    app.init_services()
+    with TemporaryDirectory() as folder:
+        path = Path(folder) / "benchmark.db"
+        engine = create_engine(f"sqlite:///{path}")
+        create_schema(engine)
+        connection = connect(str(path))
+        populate(connection)
+        measure(connection, "Without indexes")
+        create_indexes(engine)
+        connection.execute("ANALYZE")
+        measure(connection, "With indexes")
+        connection.close()
+        engine.dispose()
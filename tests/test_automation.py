@@ -0,0 +1,551 @@
+from copy import deepcopy
+from functools import partial
+from random import Random
+from threading import Event, Lock, Thread
+from time import sleep, time
+from types import SimpleNamespace
+
+from eNMS import app
+from eNMS.controller.connections import ConnectionMonitor, ConnectionPool
+from eNMS.controller.executor import RunExecutor, RunQueue
+from eNMS.controller.logs import RunLogStore
+from eNMS.controller.results import ResultWriter
+from eNMS.controller.state import create_run_state_store
+from eNMS.controller.tables import TableCountCache
+from eNMS.controller.workers import ProcessPool, WorkerPool
+from eNMS.database import Session
+from eNMS.database.functions import factory, fetch, fetch_all
+from eNMS.models.execution import DictionaryMatcher, Run
+
+
+def wait_until(condition, timeout=10):
+    deadline = time() + timeout
+    while not condition():
+        assert time() < deadline
+        sleep(0.01)
+
+
+def test_worker_pool_limits_concurrency():
+    pool, lock, counters = WorkerPool(10), Lock(), {"running": 0, "maximum": 0}
+
+    def job(value):
+        with lock:
+            counters["running"] += 1
+            counters["maximum"] = max(counters["maximum"], counters["running"])
+        sleep(0.01)
+        with lock:
+            counters["running"] -= 1
+        return value * 2
+
+    assert pool.map("run", job, range(20), 3) == [2 * i for i in range(20)]
+    assert counters["maximum"] <= 3
+    assert len(pool.workers) <= 10
+
+
+def test_worker_pool_nested_batches():
+    pool = WorkerPool(2)
+
+    def job(value):
+        return sum(pool.map(f"nested-{value}", lambda x: x, range(value), 2))
+
+    assert pool.map("parent", job, range(6), 6) == [0, 0, 1, 3, 6, 10]
+    assert not pool.metrics["batches"]
+
+
+def test_worker_pool_delayed_jobs_release_their_slot():
+    now, started, results = [0], [], []
+    pool = WorkerPool(1, clock=lambda: now[0])
+
+    def run_job(payload, device):
+        if not (yield)["success"]:
+            yield 60
+        return (yield)
+
+    def service_job(run, payload, device):
+        started.append(device)
+        return {"success": started.count(device) > 1, "device": device}
+
+    run = SimpleNamespace(run_job=run_job, service=SimpleNamespace(job=service_job))
+    job = partial(Run.delayed_results, run, {})
+    thread = Thread(target=lambda: results.append(pool.map("run", job, range(1, 6), 1)))
+    thread.start()
+    wait_until(lambda: pool.metrics["delayed_jobs"] == 5)
+    assert sorted(started) == list(range(1, 6)) and not results
+    with pool.condition:
+        now[0] = 60
+        pool.condition.notify_all()
+    thread.join(10)
+    assert results == [[{"success": True, "device": device} for device in range(1, 6)]]
+    assert not pool.metrics["delayed_jobs"]
+
+
+def test_worker_pool_dynamic_batch():
+    pool = WorkerPool(4)
+    batch = pool.open_batch("workflow", lambda value: value * 2, 2)
+    for value in range(3):
+        batch.submit(value)
+    completed = [batch.next_completed() for _ in range(3)]
+    assert sorted(completed) == [(0, 0), (1, 2), (2, 4)]
+    assert batch.next_completed() is None
+    pool.close_batch(batch)
+    assert not pool.metrics["batches"]
+
+
+def test_worker_pool_batch_wait_timeout():
+    pool = WorkerPool(1)
+    batch = pool.open_batch("workflow", lambda value: sleep(value) or value, 1)
+    batch.submit(0.5)
+    sleep(0.1)
+    start = time()
+    assert batch.next_completed(0.1) is None
+    assert time() - start < 0.3
+    assert batch.next_completed() == (0.5, 0.5)
+    pool.close_batch(batch)
+
+
+def test_process_pool_runs_jobs_in_child_processes():
+    pool = ProcessPool(2)
+    assert sorted(pool.imap(abs, range(-5, 0), 2)) == [1, 2, 3, 4, 5]
+    assert len(list(pool.imap(abs, range(10), 1, stop=lambda: True))) == 1
+
+
+class Connection:
+    closed = prompt_failure = False
+
+    def disconnect(self):
+        self.closed = True
+
+    def find_prompt(self):
+        if self.prompt_failure:
+            raise OSError("Socket is closed")
+
+
+def test_connection_pool_reuse_and_eviction():
+    pool = ConnectionPool(True, 300, 3600, 2, 1, 30)
+    first, second, third = Connection(), Connection(), Connection()
+    pool.register(("netmiko", 1, "cisco_ios", "admin", "admin"), first)
+    pool.register(("netmiko", 1, "cisco_ios", "admin", "admin"), second)
+    assert pool.acquire(("netmiko", 1, "cisco_ios", "admin", "admin")) is None
+    assert pool.release(first) and pool.release(second)
+    assert first.closed and not second.closed
+    assert pool.acquire(("netmiko", 1, "linux", "admin", "admin")) is None
+    assert pool.acquire(("netmiko", 1, "cisco_ios", "admin", "admin")) is second
+    pool.register(("netmiko", 2, "cisco_ios", "admin", "admin"), third)
+    assert pool.release(third) and pool.release(second)
+    assert not pool.release(Connection())
+    assert pool.metrics["idle"] == 2 and pool.metrics["evictions"] == 1
+
+
+def test_connection_monitor_probes_only_stale_connections():
+    now, connection = [0], Connection()
+    monitor = ConnectionMonitor(10, 20, clock=lambda: now[0])
+    monitor.track("netmiko", "router1", connection)
+    connection.prompt_failure = True
+    assert monitor.is_alive("netmiko", connection)
+    now[0] = 15
+    assert monitor.is_alive("netmiko", connection)
+    now[0] = 40
+    assert not monitor.is_alive("netmiko", connection)
+    state = monitor.metrics[0]
+    assert (state["checks"], state["probes"], state["probe_failures"]) == (3, 1, 1)
+
+
+def test_run_log_store_incremental_reads(tmp_path):
+    store = RunLogStore(tmp_path, 3)
+    store.extend("runtime", ["line 1", "line 2\nline 3"])
+    assert store.read("runtime") == (["line 1", "line 2", "line 3"], 3)
+    store.extend("runtime", ["line 4", "line 5"])
+    assert store.read("runtime", 3) == (["line 4", "line 5"], 5)
+    assert store.read("runtime", 1) == (["line 2", "line 3", "line 4", "line 5"], 5)
+    assert store.close("runtime") == str(tmp_path / "runtime.log")
+    assert store.read("runtime", 4) == (["line 5"], 5)
+    assert store.read("unknown", 0) == ([], 0)
+
+
+def test_run_log_store_tails_logs_of_other_workers(tmp_path):
+    writer, reader = RunLogStore(tmp_path, 3), RunLogStore(tmp_path, 3)
+    writer.extend("runtime", ["line 1", "line 2"])
+    assert reader.read("runtime") == (["line 1", "line 2"], 2)
+    writer.extend("runtime", ["line 3"])
+    with open(writer.path("runtime"), "a") as file:
+        file.write("partial")
+    assert reader.read("runtime", 2) == (["line 3"], 3)
+    assert reader.positions["runtime"][3] == len("line 1\nline 2\nline 3\n")
+    assert reader.read("runtime", 1) == (["line 2", "line 3"], 3)
+    writer.remove("runtime")
+    assert not writer.path("runtime").exists()
+
+
+def test_run_state_shared_between_stores(tmp_path):
+    path = tmp_path / "run_state.db"
+    runner = create_run_state_store("sqlite", path, 0.1)
+    reader = create_run_state_store("sqlite", path, 0.1)
+    state = {"status": "Running", "progress": {"device": {"success": 3}}}
+    runner.watch("runtime", state)
+    runner.add_service_run(1, 1)
+    assert reader.get("runtime")["progress"]["device"]["success"] == 3
+    assert reader.running_services() == {1: 1}
+    reader.request_stop("runtime")
+    wait_until(lambda: state["status"] == "stop")
+    wait_until(lambda: reader.get("runtime")["status"] == "stop")
+    runner.unwatch("runtime")
+    runner.add_service_run(1, -1)
+    assert reader.get("runtime") is None and not reader.running_services()
+
+
+def test_run_state_ignores_crashed_and_forked_processes(tmp_path):
+    path = tmp_path / "run_state.db"
+    crashed = create_run_state_store("sqlite", path, 0.1)
+    crashed.add_service_run(1, 1)
+    store = create_run_state_store("sqlite", path, 0.1)
+    assert store.running_services() == {1: 1}
+    with crashed.connection as connection:
+        connection.execute("UPDATE service_runs SET heartbeat = 0")
+    assert not store.running_services()
+    store.detach()
+    store.watch("runtime", {"status": "Running"})
+    assert crashed.get("runtime") is None and not store.publisher
+
+
+def test_scheduler_woken_up_when_other_processes_change_jobs(monkeypatch):
+    wakeup = Event()
+    monkeypatch.setattr(app.scheduler, "wakeup", wakeup.set)
+    app.notify_scheduler(None)
+    assert app.main_process and wakeup.wait(5)
+
+
+def test_run_queue_executor(tmp_path):
+    queue, runs = RunQueue(tmp_path / "run_queue.db"), []
+    queue.enqueue(1, {"runtime": "1", "devices": [1, 2]})
+    queue.enqueue(2, {"runtime": "2"})
+    assert queue.claim("executor1") == (1, 1, {"runtime": "1", "devices": [1, 2]})
+    assert queue.requeue("executor1") == 1
+
+    def run(service, **kwargs):
+        runs.append((service, kwargs))
+
+    executor = RunExecutor(queue, run, "e2", 2, 0.1, 30)
+    Thread(target=executor.serve, daemon=True).start()
+    wait_until(lambda: queue.metrics == {"completed": 2})
+    assert sorted(service for service, _ in runs) == [1, 2]
+
+
+def test_run_queue_requeues_expired_leases(tmp_path):
+    queue = RunQueue(tmp_path / "run_queue.db")
+    queue.enqueue(1, {"runtime": "1"})
+    queue.enqueue(2, {"runtime": "2"})
+    queue.claim("crashed")
+    queue.claim("alive")
+    queue.connection.execute("UPDATE run_queue SET heartbeat = 0")
+    queue.heartbeat("alive")
+    assert queue.requeue(lease_time=30) == 1
+    assert queue.claim("executor") == (1, 1, {})
+
+
+def test_run_queue_executor_that_lost_its_lease(tmp_path):
+    queue, runs = RunQueue(tmp_path / "run_queue.db"), []
+    queue.enqueue(1, {"runtime": "1"})
+
+    def run(service, **kwargs):
+        runs.append((service, kwargs))
+
+    slow, job = RunExecutor(queue, run, "slow", 1, 0.1, 30), queue.claim("slow")
+    queue.connection.execute("UPDATE run_queue SET heartbeat = 0")
+    assert queue.requeue(lease_time=30) == 1
+    assert queue.claim("alive") == (1, 1, {})
+    slow.slots.acquire()
+    slow.execute(*job)
+    assert not runs and queue.metrics == {"running": 1}
+    queue.complete(1, "slow", "failed")
+    assert queue.metrics == {"running": 1}
+
+
+def test_table_count_cache_invalidation():
+    cache, counts = TableCountCache(60), iter(range(10))
+    assert cache.get("run", None, lambda: next(counts)) == 0
+    assert cache.get("run", "filter", lambda: next(counts)) == 1
+    assert cache.get("run", None, lambda: next(counts)) == 0
+    cache.invalidate("run", total=False)
+    assert cache.get("run", None, lambda: next(counts)) == 0
+    assert cache.get("run", "filter", lambda: next(counts)) == 2
+    cache.invalidate("run")
+    assert cache.get("run", None, lambda: next(counts)) == 3
+    assert cache.get("result", None, lambda: next(counts)) == 4
+
+
+def test_result_writer_keeps_valid_rows_on_failure(user_client):
+    writer, result_id = ResultWriter(10, 60), 10 ** 9
+    row = {"id": result_id, "runtime": "runtime", "success": True, "result": {}}
+    writer.results = [row, dict(row)]
+    writer.flush()
+    assert fetch("result", id=result_id).runtime == "runtime"
+    assert not writer.results
+
+
+def test_result_writer_add_leaves_the_session_alone(user_client):
+    writer = ResultWriter(10, 60)
+    device = factory("device", name="pending")
+    writer.add(None, {"runtime": "runtime", "success": True, "result": {}})
+    assert device in Session.new and len(writer.results) == 1
+
+
+def timed_snippet(duration):
+    return (
+        "from time import sleep, time\n"
+        f"start = time()\nsleep({duration})\n"
+        "save_result(True, {'start': start, 'end': time()})"
+    )
+
+
+def create_workflow(name, services, edges, **kwargs):
+    workflow = factory(
+        "workflow",
+        name=name,
+        scoped_name=name,
+        run_method="per_service_with_service_targets",
+        **kwargs,
+    )
+    Session.commit()
+    instances = {
+        service_name: factory(
+            "python_snippet_service",
+            name=f"[{name}] {service_name}",
+            scoped_name=service_name,
+            workflows=[workflow.id],
+            run_method="once",
+            source_code=source_code,
+            **properties,
+        )
+        for service_name, (source_code, properties) in services.items()
+    }
+    Session.commit()
+    ids = {name: service.id for name, service in instances.items()}
+    ids["Start"] = fetch("service", scoped_name="Start").id
+    ids["End"] = fetch("service", scoped_name="End").id
+    for subtype, source, destination in edges:
+        app.add_edge(workflow.id, subtype, ids[source], ids[destination])
+    Session.commit()
+    return workflow, ids
+
+
+def service_results(service_id):
+    results = fetch_all("result", service_id=service_id)
+    return [result.result["result"] for result in results]
+
+
+def test_workflow_waits_for_prerequisites(user_client):
+    workflow, ids = create_workflow(
+        "prerequisites",
+        {
+            "fast": (timed_snippet(0), {}),
+            "slow": (timed_snippet(0.5), {}),
+            "last": (timed_snippet(0), {}),
+        },
+        [
+            ("success", "Start", "fast"),
+            ("success", "Start", "slow"),
+            ("success", "fast", "last"),
+            ("prerequisite", "slow", "last"),
+            ("success", "last", "End"),
+        ],
+        max_parallel_services=3,
+    )
+    assert app.run(workflow.id)["success"]
+    (fast,), (slow,) = service_results(ids["fast"]), service_results(ids["slow"])
+    (last,) = service_results(ids["last"])
+    assert fast["start"] < slow["end"] <= last["start"]
+
+
+def test_workflow_maximum_runs(user_client):
+    workflow, ids = create_workflow(
+        "maximum_runs",
+        {
+            "loop": (timed_snippet(0), {"maximum_runs": 2}),
+            "next": (timed_snippet(0), {}),
+        },
+        [
+            ("success", "Start", "loop"),
+            ("success", "loop", "next"),
+            ("success", "next", "loop"),
+            ("success", "loop", "End"),
+        ],
+    )
+    app.run(workflow.id)
+    assert len(service_results(ids["loop"])) == 2
+    assert len(service_results(ids["next"])) == 1
+
+
+def test_workflow_waiting_time_releases_the_thread(user_client):
+    workflow, ids = create_workflow(
+        "waiting_time",
+        {
+            "first": (timed_snippet(0), {"waiting_time": 2}),
+            "second": (timed_snippet(0), {}),
+        },
+        [
+            ("success", "Start", "first"),
+            ("success", "first", "second"),
+            ("success", "second", "End"),
+        ],
+    )
+    workflow_id, start = workflow.id, time()
+    assert app.start_run(workflow_id)["parked"] and time() - start < 2
+    completed = {"service_id": workflow_id, "status": "Completed"}
+    wait_until(lambda: fetch("run", allow_none=True, **completed))
+    (first,), (second,) = service_results(ids["first"]), service_results(ids["second"])
+    assert second["start"] >= first["end"] + 2
+
+
+def test_workflow_stop_waits_for_running_services(user_client):
+    stop_code = (
+        "from eNMS import app\n"
+        "app.stop_workflow(run.parent_runtime)\n"
+        "save_result(True, {})"
+    )
+    workflow, ids = create_workflow(
+        "stop",
+        {
+            "stop": (stop_code, {}),
+            "slow": (timed_snippet(0.5), {}),
+            "after": (timed_snippet(0), {}),
+        },
+        [
+            ("success", "Start", "stop"),
+            ("success", "Start", "slow"),
+            ("success", "stop", "after"),
+            ("success", "slow", "after"),
+        ],
+        max_parallel_services=2,
+    )
+    app.run(workflow.id)
+    assert len(service_results(ids["slow"])) == 1
+    assert not service_results(ids["after"])
+    assert all(run.status != "Running" for run in fetch("service", id=ids["slow"]).runs)
+
+
+def test_multiprocessing_postprocessing_on_detached_run(user_client):
+    devices = [
+        factory("device", name=f"postprocessing{index}", ip_address=f"10.0.0.{index}")
+        for index in range(3)
+    ]
+    source = factory(
+        "python_snippet_service",
+        name="postprocessing source",
+        scoped_name="postprocessing source",
+        run_method="once",
+        source_code="save_result(True, 'source')",
+    )
+    service = factory(
+        "python_snippet_service",
+        name="postprocessing target",
+        scoped_name="postprocessing target",
+        multiprocessing=True,
+        max_processes=3,
+        source_code="save_result(True, device.name)",
+        result_postprocessing=(
+            "results['devices'] = sorted(device.name for device in devices)\n"
+            "results['source'] = get_result('postprocessing source')['result']"
+        ),
+    )
+    Session.commit()
+    app.run(source.id)
+    restart_run = factory(
+        "run", service=service.id, restart_run=fetch("run", service_id=source.id)
+    )
+    Session.commit()
+    device_ids = [device.id for device in devices]
+    app.run(service.id, devices=device_ids, restart_runtime=restart_run.runtime)
+    results = [
+        result.result
+        for result in fetch("result", all_matches=True, service_id=service.id)
+        if result.device_id
+    ]
+    assert len(results) == 3
+    for result in results:
+        assert result["devices"] == [device.name for device in devices]
+        assert result["source"] == "source"
+
+
+backoff_attempts = []
+
+
+def test_retry_backoff_frees_the_worker_slot(user_client):
+    devices = [
+        factory("device", name=f"backoff{index}", ip_address=f"10.0.1.{index}")
+        for index in range(2)
+    ]
+    service = factory(
+        "python_snippet_service",
+        name="backoff",
+        scoped_name="backoff",
+        multiprocessing=True,
+        max_processes=1,
+        number_of_retries=1,
+        time_between_retries=1,
+        source_code=(
+            "from tests.test_automation import backoff_attempts\n"
+            "backoff_attempts.append(device.name)\n"
+            "save_result(device.name != 'backoff0' or len(backoff_attempts) > 1, '')"
+        ),
+    )
+    Session.commit()
+    assert app.run(service.id, devices=[device.id for device in devices])["success"]
+    assert backoff_attempts == ["backoff0", "backoff1", "backoff0"]
+
+
+def match_dictionary(result, match, first=True):
+    match_copy = deepcopy(match) if first else match
+    if isinstance(result, dict):
+        for k, v in result.items():
+            if k in match_copy and match_copy[k] == v:
+                match_copy.pop(k)
+            else:
+                match_dictionary(v, match_copy, False)
+    elif isinstance(result, list):
+        for item in result:
+            match_dictionary(item, match_copy, False)
+    return not match_copy
+
+
+def test_dictionary_matcher_parity():
+    generator = Random(0)
+
+    def random_value(depth):
+        kind = generator.randrange(4 if depth < 3 else 2)
+        if kind == 0:
+            return generator.choice((0, 1, "a", None))
+        elif kind == 1:
+            return [generator.choice((0, 1))]
+        elif kind == 2:
+            return {
+                generator.choice("abcd"): random_value(depth + 1)
+                for _ in range(generator.randrange(1, 5))
+            }
+        return [random_value(depth + 1) for _ in range(generator.randrange(1, 4))]
+
+    for _ in range(20_000):
+        match = {
+            generator.choice("abcd"): random_value(3)
+            for _ in range(generator.randrange(1, 4))
+        }
+        result = [random_value(0) for _ in range(4)]
+        assert DictionaryMatcher(match)(result) == match_dictionary(result, match)
+
+
+def test_dict_equal_compares_with_substituted_match(user_client):
+    service = factory(
+        "python_snippet_service",
+        name="dict_equal",
+        scoped_name="dict_equal",
+        validation_method="dict_equal",
+        dict_match={"hostname": "{{payload['hostname']}}"},
+    )
+    Session.commit()
+    run, payload = factory("run", service=service.id), {"hostname": "router1"}
+    Session.flush()
+    results = {"result": {"hostname": "router1"}}
+    run.validate_result(results, payload, None)
+    assert results["success"] and results["match"] == {"hostname": "router1"}
+    results = {"result": {"hostname": "{{payload['hostname']}}"}}
+    run.validate_result(results, payload, None)
+    assert not results["success"]
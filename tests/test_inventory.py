@@ -1,7 +1,15 @@
+from sqlalchemy import event
 from werkzeug.datastructures import ImmutableMultiDict
 
 from eNMS import app
-from eNMS.database.functions import delete_all, fetch, fetch_all
+from eNMS.database import engine, functions
+from eNMS.database.functions import (
+    collation_key,
+    delete_all,
+    fetch,
+    fetch_all,
+    fetch_in,
+)
 from eNMS.properties.objects import (
     device_icons,
     pool_link_properties,
@@ -80,6 +88,51 @@ def test_object_creation_type(user_client):
     assert len(fetch_all("link")) == 0
 
 
+def test_device_lookup_in_chunks(user_client):
+    create_from_file(user_client, "europe.xls")
+    names = [device.name for device in fetch_all("device")] + ["unknown"]
+    devices, not_found = fetch_in("device", "name", names * 2, chunk_size=10)
+    assert len(devices) == 33
+    assert not_found == ["unknown"]
+
+
+def test_device_lookup_follows_database_collation(monkeypatch):
+    monkeypatch.setattr(functions, "DIALECT", "mysql")
+    assert collation_key("Router1 ") == collation_key("router1")
+    assert collation_key(1) == 1
+    monkeypatch.setattr(functions, "DIALECT", "sqlite")
+    assert collation_key("Router1") != collation_key("router1")
+
+
+def test_table_query_count_is_constant(user_client):
+    create_from_file(user_client, "europe.xls")
+    statements = []
+
+    def count_statement(connection, cursor, statement, *args):
+        statements.append(statement)
+
+    def table_page_queries(length):
+        statements.clear()
+        user_client.post(
+            "/table_filtering/link",
+            json={
+                "draw": 1,
+                "start": 0,
+                "length": length,
+                "form": {},
+                "order": [{"column": 0, "dir": "asc"}],
+            },
+        )
+        return len(statements)
+
+    event.listen(engine, "before_cursor_execute", count_statement)
+    try:
+        table_page_queries(5)
+        assert table_page_queries(5) == table_page_queries(40)
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statement)
+
+
 routers = ["router" + str(i) for i in range(5, 20)]
 links = ["link" + str(i) for i in range(4, 15)]
 